@@ -0,0 +1,170 @@
+import asyncio
+import os
+import time
+import numpy as np
+from typing import List, Optional
+from sqlalchemy import case, func, select
+from database import engine
+from models.review import Review
+
+# How long a computed snapshot is served before the reviews are reloaded
+ANALYTICS_CACHE_TTL = float(os.getenv("ANALYTICS_CACHE_TTL", "300"))
+
+# Sentiments are loaded as small integer codes; reviews without a sentiment
+# get the code after the last label
+SENTIMENT_LABELS = ("positive", "negative", "neutral")
+UNSCORED = len(SENTIMENT_LABELS)
+
+# Sentiment code a whole-star rating agrees with: 4-5 stars positive,
+# 1-2 stars negative, 3 stars neutral (indexed by star - 1)
+STAR_POLARITY = np.array([1, 1, 2, 0, 0])
+
+
+def load_review_arrays():
+    """Load movie_id, rating and sentiment code for every review as NumPy arrays
+
+    Each column is aggregated into a single Postgres array so the whole table
+    arrives as one row instead of one Python object per review.
+    """
+    sentiment_code = case(
+        *[(Review.sentiment == label, code) for code, label in enumerate(SENTIMENT_LABELS)],
+        else_=UNSCORED
+    )
+    with engine.connect() as connection:
+        movie_ids, ratings, sentiments = connection.execute(select(
+            func.array_agg(Review.movie_id),
+            func.array_agg(Review.rating),
+            func.array_agg(sentiment_code)
+        )).one()
+
+    # array_agg over an empty table is NULL
+    return (
+        np.array(movie_ids or [], dtype=np.int64),
+        np.array(ratings or [], dtype=np.float64),
+        np.array(sentiments or [], dtype=np.int64)
+    )
+
+
+def rate(numerator, denominator):
+    """Element-wise ratio that is NaN where the denominator is zero"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    return np.divide(numerator, denominator, out=np.full(numerator.shape, np.nan), where=denominator > 0)
+
+
+def rounded(value: float, digits: int = 3) -> Optional[float]:
+    """JSON-friendly rounding that maps NaN to None"""
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+class ReviewAnalytics:
+    """Per-movie and catalogue-wide sentiment and rating aggregates
+
+    Every aggregate is computed with a handful of vectorized bincount passes
+    over the review arrays, grouped by the position of each review's movie
+    in the sorted array of distinct movie IDs.
+    """
+
+    def __init__(self, movie_ids: np.ndarray, ratings: np.ndarray, sentiments: np.ndarray):
+        self.movie_ids, index = np.unique(movie_ids, return_inverse=True)
+        movies = len(self.movie_ids)
+        stars = np.clip(np.floor(ratings), 1, 5).astype(np.int64) - 1
+        agrees = (sentiments != UNSCORED) & (sentiments == STAR_POLARITY[stars])
+
+        self.review_counts = np.bincount(index, minlength=movies)
+        self.rating_sums = np.bincount(index, weights=ratings, minlength=movies)
+        self.star_counts = np.bincount(index * 5 + stars, minlength=movies * 5).reshape(movies, 5)
+        self.sentiment_counts = np.bincount(
+            index * (UNSCORED + 1) + sentiments, minlength=movies * (UNSCORED + 1)
+        ).reshape(movies, UNSCORED + 1)
+        self.agreement_counts = np.bincount(index, weights=agrees, minlength=movies).astype(np.int64)
+
+        # Catalogue-wide sentiment x star matrix and average rating per sentiment
+        self.sentiment_by_stars = np.bincount(
+            sentiments * 5 + stars, minlength=(UNSCORED + 1) * 5
+        ).reshape(UNSCORED + 1, 5)
+        self.sentiment_rating_sums = np.bincount(sentiments, weights=ratings, minlength=UNSCORED + 1)
+
+        self.built_at = time.time()
+
+    def overview(self) -> dict:
+        """Catalogue-wide aggregates"""
+        total = int(self.review_counts.sum())
+        sentiment_totals = self.sentiment_by_stars.sum(axis=1)
+        scored = total - int(sentiment_totals[UNSCORED])
+        sentiment_averages = rate(self.sentiment_rating_sums, sentiment_totals)
+
+        return {
+            "total_reviews": total,
+            "total_movies": len(self.movie_ids),
+            "average_rating": rounded(rate(self.rating_sums.sum(), total), 2),
+            "rating_distribution": {str(star + 1): int(count) for star, count in enumerate(self.star_counts.sum(axis=0))},
+            "sentiment_counts": self._sentiment_counts(sentiment_totals),
+            "average_rating_by_sentiment": {label: rounded(sentiment_averages[code], 2) for code, label in enumerate(SENTIMENT_LABELS)},
+            "rating_distribution_by_sentiment": {
+                label: {str(star + 1): int(count) for star, count in enumerate(self.sentiment_by_stars[code])}
+                for code, label in enumerate(SENTIMENT_LABELS)
+            },
+            "agreement_rate": rounded(rate(self.agreement_counts.sum(), scored)),
+            "generated_at": self.built_at,
+        }
+
+    def movie(self, movie_id: int) -> dict:
+        """Aggregates for one movie, with zero counts for a movie without reviews"""
+        position = np.searchsorted(self.movie_ids, movie_id)
+        if position < len(self.movie_ids) and self.movie_ids[position] == movie_id:
+            return self._movie_report(position)
+        return {
+            "movie_id": movie_id,
+            "total_reviews": 0,
+            "average_rating": None,
+            "rating_distribution": {str(star): 0 for star in range(1, 6)},
+            "sentiment_counts": self._sentiment_counts(np.zeros(UNSCORED + 1, dtype=np.int64)),
+            "agreement_rate": None,
+        }
+
+    def top_movies(self, limit: int) -> List[dict]:
+        """Aggregates for the most reviewed movies"""
+        order = np.argsort(-self.review_counts, kind="stable")[:limit]
+        return [self._movie_report(position) for position in order]
+
+    def _movie_report(self, position: int) -> dict:
+        count = self.review_counts[position]
+        scored = count - self.sentiment_counts[position, UNSCORED]
+        return {
+            "movie_id": int(self.movie_ids[position]),
+            "total_reviews": int(count),
+            "average_rating": rounded(self.rating_sums[position] / count, 2),
+            "rating_distribution": {str(star + 1): int(c) for star, c in enumerate(self.star_counts[position])},
+            "sentiment_counts": self._sentiment_counts(self.sentiment_counts[position]),
+            "agreement_rate": rounded(rate(self.agreement_counts[position], scored)),
+        }
+
+    @staticmethod
+    def _sentiment_counts(counts) -> dict:
+        result = {label: int(counts[code]) for code, label in enumerate(SENTIMENT_LABELS)}
+        result["unscored"] = int(counts[UNSCORED])
+        return result
+
+
+def build_analytics() -> ReviewAnalytics:
+    """Load every review and compute a new snapshot"""
+    return ReviewAnalytics(*load_review_arrays())
+
+
+# Latest snapshot, rebuilt at most once per ANALYTICS_CACHE_TTL
+_snapshot: Optional[ReviewAnalytics] = None
+_snapshot_lock = asyncio.Lock()
+
+
+async def get_analytics() -> ReviewAnalytics:
+    """Current snapshot, rebuilt off the event loop once it has expired
+
+    Concurrent callers during a rebuild wait for the same rebuild.
+    """
+    global _snapshot
+    async with _snapshot_lock:
+        if _snapshot is None or time.time() - _snapshot.built_at > ANALYTICS_CACHE_TTL:
+            loop = asyncio.get_running_loop()
+            _snapshot = await loop.run_in_executor(None, build_analytics)
+    return _snapshot
@@ -0,0 +1,166 @@
+"""Local stand-ins for the TMDb and Groq APIs
+
+Serves a deterministic synthetic catalogue under /3 (TMDb) and an
+OpenAI-compatible chat completions endpoint under /openai/v1 (Groq), with
+configurable latency and error rate. Configured through environment
+variables so it can be started as a plain uvicorn app:
+
+    uvicorn benchmarks.fake_services:app --port 9001
+"""
+import asyncio
+import json
+import os
+import random
+import zlib
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Number of movies in the synthetic catalogue (IDs 1..N)
+FAKE_CATALOGUE_SIZE = int(os.getenv("FAKE_CATALOGUE_SIZE", "2000"))
+
+# Latency of each TMDb response: mean plus uniform jitter, in milliseconds
+FAKE_TMDB_LATENCY_MS = float(os.getenv("FAKE_TMDB_LATENCY_MS", "40"))
+FAKE_TMDB_JITTER_MS = float(os.getenv("FAKE_TMDB_JITTER_MS", "20"))
+
+# Time for a whole chat completion; streamed completions spread it over their chunks
+FAKE_GROQ_LATENCY_MS = float(os.getenv("FAKE_GROQ_LATENCY_MS", "800"))
+
+# Share of requests answered with a 500 error, for both services
+FAKE_ERROR_RATE = float(os.getenv("FAKE_ERROR_RATE", "0"))
+
+GENRES = ["Action", "Comedy", "Drama", "Horror", "Romance", "Science Fiction", "Thriller", "Animation"]
+KEYWORDS = ["heist", "space", "friendship", "revenge", "time travel", "small town", "robot", "family"]
+STREAM_CHUNK_SIZE = 16
+PAGE_SIZE = 20
+
+app = FastAPI(title="Fake TMDb and Groq")
+
+
+def movie_title(movie_id: int) -> str:
+    return f"Benchmark Movie {movie_id}"
+
+
+def movie_summary(movie_id: int) -> dict:
+    """List-view fields, identical on every call for the same movie"""
+    return {
+        "id": movie_id,
+        "title": movie_title(movie_id),
+        "original_title": movie_title(movie_id),
+        "adult": False,
+        "poster_path": f"/poster{movie_id}.jpg",
+        "backdrop_path": f"/backdrop{movie_id}.jpg",
+        "overview": f"Synthetic overview for movie {movie_id}.",
+        "release_date": f"{1980 + movie_id % 45}-{1 + movie_id % 12:02d}-{1 + movie_id % 28:02d}",
+        "vote_average": round(5 + (zlib.crc32(str(movie_id).encode()) % 50) / 10, 1),
+        "vote_count": 100 + movie_id % 5000,
+        "popularity": round(1000 / movie_id, 3),
+        "genre_ids": [movie_id % len(GENRES), (movie_id // 3) % len(GENRES)],
+    }
+
+
+def movie_details(movie_id: int) -> dict:
+    """Full details, including everything the app asks for with append_to_response"""
+    details = movie_summary(movie_id)
+    details.update({
+        "genres": [{"id": genre_id, "name": GENRES[genre_id]} for genre_id in dict.fromkeys(details.pop("genre_ids"))],
+        "runtime": 80 + movie_id % 70,
+        "production_companies": [{"id": movie_id % 50, "name": f"Studio {movie_id % 50}"}],
+        "keywords": {"keywords": [{"id": index, "name": KEYWORDS[(movie_id + index) % len(KEYWORDS)]} for index in range(3)]},
+        "credits": {"cast": [{"id": movie_id * 10 + index, "name": f"Actor {movie_id * 10 + index}"} for index in range(5)], "crew": []},
+        "videos": {"results": []},
+        "reviews": {"page": 1, "results": [], "total_pages": 0, "total_results": 0},
+    })
+    return details
+
+
+async def tmdb_delay():
+    await asyncio.sleep(max(0.0, FAKE_TMDB_LATENCY_MS + random.uniform(-FAKE_TMDB_JITTER_MS, FAKE_TMDB_JITTER_MS)) / 1000)
+
+
+def fails() -> bool:
+    return random.random() < FAKE_ERROR_RATE
+
+
+def tmdb_error() -> JSONResponse:
+    return JSONResponse({"status_code": 11, "status_message": "Internal error (simulated)."}, status_code=500)
+
+
+@app.get("/3/movie/popular")
+async def popular(page: int = 1):
+    await tmdb_delay()
+    if fails():
+        return tmdb_error()
+    total_pages = max(1, FAKE_CATALOGUE_SIZE // PAGE_SIZE)
+    first = (min(page, total_pages) - 1) * PAGE_SIZE + 1
+    return {
+        "page": page,
+        "results": [movie_summary(movie_id) for movie_id in range(first, min(first + PAGE_SIZE, FAKE_CATALOGUE_SIZE + 1))],
+        "total_pages": total_pages,
+        "total_results": FAKE_CATALOGUE_SIZE,
+    }
+
+
+@app.get("/3/search/movie")
+async def search(query: str, page: int = 1):
+    await tmdb_delay()
+    if fails():
+        return tmdb_error()
+    # Titles end in their ID; anything else maps to a stable movie by hash
+    digits = "".join(char for char in query if char.isdigit())
+    movie_id = int(digits) if digits else zlib.crc32(query.lower().encode()) % FAKE_CATALOGUE_SIZE + 1
+    results = [movie_summary(movie_id)] if 1 <= movie_id <= FAKE_CATALOGUE_SIZE else []
+    return {"page": page, "results": results, "total_pages": 1, "total_results": len(results)}
+
+
+@app.get("/3/movie/{movie_id}")
+async def details(movie_id: int):
+    await tmdb_delay()
+    if fails():
+        return tmdb_error()
+    if not 1 <= movie_id <= FAKE_CATALOGUE_SIZE:
+        return JSONResponse({"status_code": 34, "status_message": "The resource you requested could not be found."}, status_code=404)
+    return movie_details(movie_id)
+
+
+def recommendation_text(prompt: str) -> str:
+    """Five catalogue titles picked deterministically from the prompt, as the prompt asks"""
+    seed = random.Random(zlib.crc32(prompt.encode()))
+    movie_ids = seed.sample(range(1, FAKE_CATALOGUE_SIZE + 1), 5)
+    recommendations = [{"title": movie_title(movie_id), "reason": f"Matches your taste, like movie {movie_id}."} for movie_id in movie_ids]
+    return "```json\n" + json.dumps(recommendations, indent=2) + "\n```"
+
+
+def completion_chunk(content: str) -> str:
+    chunk = {
+        "id": "fake", "object": "chat.completion.chunk", "created": 0, "model": "fake",
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    if fails():
+        return JSONResponse({"error": {"message": "Internal error (simulated)", "type": "internal_error"}}, status_code=500)
+
+    text = recommendation_text(json.dumps(body.get("messages", [])))
+    latency = FAKE_GROQ_LATENCY_MS / 1000
+
+    if body.get("stream"):
+        chunks = [text[start:start + STREAM_CHUNK_SIZE] for start in range(0, len(text), STREAM_CHUNK_SIZE)]
+
+        async def events():
+            for chunk in chunks:
+                await asyncio.sleep(latency / len(chunks))
+                yield completion_chunk(chunk)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(latency)
+    return {
+        "id": "fake", "object": "chat.completion", "created": 0, "model": "fake",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
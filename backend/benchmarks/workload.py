@@ -0,0 +1,160 @@
+"""Closed-loop workload driver and latency statistics
+
+A fixed number of workers each run scenarios back to back, picked at random
+by weight, and every HTTP request is timed under its route template.
+"""
+import asyncio
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+import httpx
+import numpy as np
+
+REVIEW_TEXTS = [
+    ("An amazing film with a brilliant cast, I loved every minute of it.", 5.0),
+    ("Great story and excellent acting, highly recommend it.", 4.5),
+    ("Good fun overall, although the middle drags a little.", 4.0),
+    ("An okay watch. Some scenes work, others do not.", 3.0),
+    ("Boring and predictable, the plot made little sense.", 2.0),
+    ("Terrible pacing and awful dialogue, a waste of time.", 1.0),
+]
+
+# Default scenario weights
+DEFAULT_MIX = {"popular": 4, "detail": 4, "review": 1, "recommendations": 1}
+
+
+class LatencyRecorder:
+    """Per-endpoint latencies and error counts"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.recording = False
+
+    async def request(self, client: httpx.AsyncClient, method: str, endpoint: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Send a request, recording its latency under `endpoint` while recording is on"""
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+        except httpx.HTTPError:
+            response = None
+        elapsed = time.perf_counter() - start
+
+        if self.recording:
+            name = f"{method} {endpoint}"
+            self.latencies[name].append(elapsed)
+            if response is None or response.status_code >= 400:
+                self.errors[name] += 1
+        return response
+
+    def report(self, duration: float) -> dict:
+        """Throughput and latency percentiles (in milliseconds) per endpoint and overall"""
+        endpoints = {name: summarize(values, self.errors[name], duration) for name, values in sorted(self.latencies.items())}
+        all_values = [value for values in self.latencies.values() for value in values]
+        return {
+            "total": summarize(all_values, sum(self.errors.values()), duration),
+            "endpoints": endpoints,
+        }
+
+
+def summarize(latencies: List[float], errors: int, duration: float) -> dict:
+    values = np.array(latencies) * 1000
+    summary = {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / duration, 2) if duration else 0.0,
+    }
+    if len(values):
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        summary["latency_ms"] = {
+            "p50": round(float(p50), 2),
+            "p95": round(float(p95), 2),
+            "p99": round(float(p99), 2),
+            "mean": round(float(values.mean()), 2),
+            "max": round(float(values.max()), 2),
+        }
+    return summary
+
+
+class Workload:
+    """Browse, detail, review and recommendation scenarios over a fixed user set"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: LatencyRecorder, catalogue_size: int, seed: int = 0):
+        self.client = client
+        self.recorder = recorder
+        self.catalogue_size = catalogue_size
+        self.random = random.Random(seed)
+        self.user_ids: List[str] = []
+        self.reviewed: Dict[str, set] = defaultdict(set)
+
+    def pick_movie(self) -> int:
+        """Skewed towards popular (low) IDs, like real browsing"""
+        return min(self.catalogue_size, int(self.random.paretovariate(1.2)))
+
+    async def register_users(self, count: int, prefix: str):
+        async def register(index: int):
+            response = await self.client.post("/auth/register", json={
+                "username": f"{prefix}{index}",
+                "email": f"{prefix}{index}@bench.example.com",
+                "password": "benchmark-password",
+            })
+            response.raise_for_status()
+            return response.json()["id"]
+
+        self.user_ids = list(await asyncio.gather(*(register(index) for index in range(count))))
+
+    async def seed_reviews(self, per_user: int):
+        """Give every user a review history so recommendations have input"""
+        await asyncio.gather(*(self.post_review(user_id) for user_id in self.user_ids for _ in range(per_user)))
+
+    async def post_review(self, user_id: Optional[str] = None):
+        user_id = user_id or self.random.choice(self.user_ids)
+        movie_id = self.pick_movie()
+        # A user can review a movie once; pick another movie rather than get a 400
+        for _ in range(10):
+            if movie_id not in self.reviewed[user_id]:
+                break
+            movie_id = self.random.randint(1, self.catalogue_size)
+        self.reviewed[user_id].add(movie_id)
+        content, rating = self.random.choice(REVIEW_TEXTS)
+        await self.recorder.request(self.client, "POST", "/reviews/", "/reviews/", json={
+            "user_id": user_id, "movie_id": movie_id, "content": content, "rating": rating,
+        })
+
+    async def browse_popular(self):
+        page = min(5, int(self.random.paretovariate(1.5)))
+        await self.recorder.request(self.client, "GET", "/movies/popular", f"/movies/popular?page={page}")
+
+    async def open_movie_detail(self):
+        movie_id = self.pick_movie()
+        await asyncio.gather(
+            self.recorder.request(self.client, "GET", "/movies/{movie_id}", f"/movies/{movie_id}"),
+            self.recorder.request(self.client, "GET", "/reviews/{movie_id}", f"/reviews/{movie_id}"),
+            self.recorder.request(self.client, "GET", "/reviews/stats/{movie_id}", f"/reviews/stats/{movie_id}"),
+        )
+
+    async def get_recommendations(self):
+        user_id = self.random.choice(self.user_ids)
+        await self.recorder.request(
+            self.client, "GET", "/reviews/recommendations/{user_id}", f"/reviews/recommendations/{user_id}"
+        )
+
+    async def run(self, concurrency: int, duration: float, mix: Dict[str, float]):
+        """Run `concurrency` workers for `duration` seconds"""
+        scenarios = {
+            "popular": self.browse_popular,
+            "detail": self.open_movie_detail,
+            "review": self.post_review,
+            "recommendations": self.get_recommendations,
+        }
+        names = [name for name in mix if mix[name] > 0]
+        weights = [mix[name] for name in names]
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                await scenarios[self.random.choices(names, weights)[0]]()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
@@ -0,0 +1,64 @@
+"""Remove duplicate reviews and add the one-review-per-movie unique index
+
+Before reviews were inserted with ON CONFLICT, concurrent requests could
+store two reviews by the same user for the same movie, and such a database
+cannot get the uq_reviews_user_id_movie_id index. This keeps the newest
+review of every (user_id, movie_id) pair, deletes the others and creates
+the index in one transaction, then rebuilds movie_stats. Run it once
+against an existing database before deploying; it is a no-op afterwards:
+
+    python dedupe_reviews.py
+    python dedupe_reviews.py --dry-run
+"""
+import argparse
+from sqlalchemy import delete, func, select, text
+from database import Base, engine
+import models  # registers every table with Base
+from models.review import Review
+from stats_store import rebuild_movie_stats
+
+UNIQUE_INDEX = next(index for index in Review.__table__.indexes if index.name == "uq_reviews_user_id_movie_id")
+
+
+def duplicate_review_ids():
+    """IDs of every review except the newest per (user_id, movie_id)"""
+    ranked = select(
+        Review.id,
+        func.row_number().over(
+            partition_by=(Review.user_id, Review.movie_id),
+            order_by=(Review.created_at.desc(), Review.id.desc())
+        ).label("position")
+    ).subquery("ranked")
+    return select(ranked.c.id).where(ranked.c.position > 1)
+
+
+def dedupe_reviews(dry_run: bool = False) -> int:
+    """Delete duplicate reviews and create the unique index; returns the number deleted"""
+    # This runs before the new version's first start, so tables it introduced
+    # (movie_stats) may not exist yet; create_all leaves existing tables alone
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as connection:
+        # Block new reviews until the index exists
+        connection.execute(text("LOCK TABLE reviews IN SHARE ROW EXCLUSIVE MODE"))
+        if dry_run:
+            return connection.execute(select(func.count()).select_from(duplicate_review_ids().subquery())).scalar_one()
+
+        deleted = connection.execute(delete(Review).where(Review.id.in_(duplicate_review_ids()))).rowcount
+        UNIQUE_INDEX.create(bind=connection, checkfirst=True)
+
+    if deleted:
+        rebuild_movie_stats()
+    return deleted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove duplicate reviews and add the unique (user_id, movie_id) index")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the reviews that would be deleted")
+    args = parser.parse_args()
+
+    deleted = dedupe_reviews(args.dry_run)
+    if args.dry_run:
+        print(f"{deleted} duplicate reviews would be deleted")
+    else:
+        print(f"Deleted {deleted} duplicate reviews; unique index in place")
@@ -0,0 +1,152 @@
+import asyncio
+import httpx
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+from dotenv import load_dotenv
+from groq import AsyncGroq
+from metrics import track_outbound
+
+load_dotenv()
+
+# Groq API configuration
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+
+# Hard deadline for a whole completion, including every streamed chunk
+GROQ_DEADLINE = float(os.getenv("GROQ_DEADLINE", "20"))
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "1"))
+
+# Shared client, created on first use and closed on shutdown
+_client: Optional[AsyncGroq] = None
+
+
+def get_client() -> Optional[AsyncGroq]:
+    """Get the shared async Groq client, or None when no API key is configured"""
+    global _client
+    if not GROQ_API_KEY:
+        return None
+    if _client is None or _client.is_closed():
+        _client = AsyncGroq(
+            api_key=GROQ_API_KEY,
+            base_url=GROQ_BASE_URL or None,
+            timeout=httpx.Timeout(GROQ_DEADLINE, connect=GROQ_CONNECT_TIMEOUT),
+            max_retries=GROQ_MAX_RETRIES
+        )
+    return _client
+
+
+async def close_client():
+    """Close the shared Groq client and release pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+async def chat_completion(messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7) -> Optional[str]:
+    """Run a chat completion and return the message text
+
+    Returns None when Groq is not configured. Raises asyncio.TimeoutError
+    if the completion misses GROQ_DEADLINE, and Groq errors as they are.
+    """
+    client = get_client()
+    if client is None:
+        return None
+
+    with track_outbound("groq", "chat.completions"):
+        completion = await asyncio.wait_for(
+            client.chat.completions.create(
+                messages=messages,
+                model=GROQ_MODEL,
+                temperature=temperature,
+                max_tokens=max_tokens
+            ),
+            GROQ_DEADLINE
+        )
+    return completion.choices[0].message.content
+
+
+async def stream_chat_completion(messages: List[Dict[str, str]], max_tokens: int = 1000, temperature: float = 0.7) -> AsyncIterator[str]:
+    """Stream a chat completion as text fragments
+
+    Yields nothing when Groq is not configured. The whole stream shares one
+    GROQ_DEADLINE; asyncio.TimeoutError is raised when it runs out.
+    """
+    client = get_client()
+    if client is None:
+        return
+
+    # Timed until the last chunk arrives or the consumer stops reading
+    with track_outbound("groq", "chat.completions.stream"):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + GROQ_DEADLINE
+        stream = await asyncio.wait_for(
+            client.chat.completions.create(
+                messages=messages,
+                model=GROQ_MODEL,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            ),
+            GROQ_DEADLINE
+        )
+
+        try:
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - loop.time()))
+                except StopAsyncIteration:
+                    break
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.close()
+
+
+class JsonObjectStream:
+    """Incrementally extract complete JSON objects from streamed text
+
+    Feed it fragments of a JSON array of objects (optionally wrapped in
+    markdown fences or other text) and it returns each object as soon as its
+    closing brace arrives. Braces inside strings are ignored.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[Any]:
+        """Consume a fragment and return the objects it completed"""
+        completed = []
+        for char in text:
+            if self._depth:
+                self._buffer.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"' and self._depth:
+                self._in_string = True
+            elif char == "{":
+                if not self._depth:
+                    self._buffer = [char]
+                self._depth += 1
+            elif char == "}" and self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    try:
+                        completed.append(json.loads("".join(self._buffer)))
+                    except json.JSONDecodeError:
+                        pass
+                    self._buffer = []
+        return completed
@@ -1,5 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+import asyncio
 import os
 from dotenv import load_dotenv
 
@@ -32,8 +34,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# ETags, conditional GETs and gzip for JSON responses
+from response_middleware import ConditionalResponseMiddleware
+app.add_middleware(ConditionalResponseMiddleware)
+
+# Per-route latency, status, in-flight and SQL usage metrics; added last so
+# it wraps every other middleware
+from metrics import MetricsMiddleware, render_prometheus
+app.add_middleware(MetricsMiddleware, router=app.router)
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -44,18 +56,54 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+# Database connection pool telemetry
+@app.get("/health/db")
+async def database_pool_stats():
+    from database import get_pool_stats
+    return get_pool_stats()
+
+# Prometheus metrics
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 # Include routers
-from routers import movies, reviews, sentiment, auth
+from routers import movies, reviews, sentiment, auth, analytics
 app.include_router(movies.router, prefix="/movies", tags=["movies"])
 app.include_router(reviews.router, prefix="/reviews", tags=["reviews"])
 app.include_router(sentiment.router, prefix="/sentiment", tags=["sentiment"])
 app.include_router(auth.router, prefix="/auth", tags=["authentication"])
+app.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+
+# Background tasks started on startup
+background_tasks = []
 
-# Initialize database tables
+# Initialize database tables, shared HTTP client and background refreshers
 @app.on_event("startup")
 async def startup_event():
     from database import create_tables
+    from metadata_store import run_metadata_refresher
+    from recommender import run_engine_refresher
+    from stats_store import backfill_movie_stats_if_empty
+    import tmdb_client
     create_tables()
+    backfill_movie_stats_if_empty()
+    await tmdb_client.start_client()
+    background_tasks.append(asyncio.create_task(run_metadata_refresher()))
+    background_tasks.append(asyncio.create_task(run_engine_refresher()))
+
+# Stop background tasks and release pooled connections
+@app.on_event("shutdown")
+async def shutdown_event():
+    from database import async_engine
+    import llm_client
+    import tmdb_client
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+    await tmdb_client.close_client()
+    await llm_client.close_client()
+    await async_engine.dispose()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import AsyncSessionLocal
+from models.movie_metadata import MovieMetadata
+from tmdb_client import TMDB_API_KEY, tmdb_get
+
+logger = logging.getLogger(__name__)
+
+# Staleness policy: rows older than this are refetched from TMDb
+METADATA_MAX_AGE = timedelta(hours=float(os.getenv("METADATA_MAX_AGE_HOURS", "168")))
+
+# Background refresher settings
+METADATA_REFRESH_INTERVAL = float(os.getenv("METADATA_REFRESH_INTERVAL", "3600"))
+METADATA_REFRESH_BATCH = int(os.getenv("METADATA_REFRESH_BATCH", "50"))
+
+# Rows whose refresh fails (movie removed from TMDb, adult, upstream errors)
+# are retried after this long instead of heading every refresh batch
+METADATA_REFRESH_RETRY_AFTER = timedelta(hours=float(os.getenv("METADATA_REFRESH_RETRY_HOURS", "24")))
+
+
+async def fetch_movie_metadata_from_tmdb(movie_id: int) -> Optional[dict]:
+    """Get detailed movie metadata including genres and keywords from TMDb API"""
+    if not TMDB_API_KEY:
+        return None
+
+    try:
+        # Get movie details and keywords in a single call
+        params = {
+            "language": "en-US",
+            "append_to_response": "keywords"
+        }
+        movie_details = await tmdb_get(f"/movie/{movie_id}", params)
+        keywords_data = movie_details.get("keywords", {})
+
+        return {
+            "id": movie_details["id"],
+            "title": movie_details["title"],
+            "genres": [genre["name"] for genre in movie_details.get("genres", [])],
+            "keywords": [keyword["name"] for keyword in keywords_data.get("keywords", [])[:10]],  # Limit to 10 keywords
+            "overview": movie_details.get("overview", ""),
+            "poster_path": movie_details.get("poster_path"),
+            "release_date": movie_details.get("release_date", ""),
+            "vote_average": movie_details.get("vote_average", 0.0),
+            "runtime": movie_details.get("runtime", 0),
+            "director": None,  # We'll get this from credits if needed
+            "production_companies": [company["name"] for company in movie_details.get("production_companies", [])[:3]]
+        }
+
+    except Exception:
+        return None
+
+
+def metadata_to_dict(row: MovieMetadata) -> dict:
+    """Convert a stored row to the metadata dict used by the recommendation pipeline"""
+    return {
+        "id": row.movie_id,
+        "title": row.title,
+        "genres": row.genres or [],
+        "keywords": row.keywords or [],
+        "overview": row.overview or "",
+        "poster_path": row.poster_path,
+        "release_date": row.release_date or "",
+        "vote_average": row.vote_average or 0.0,
+        "runtime": row.runtime or 0,
+        "director": None,
+        "production_companies": row.production_companies or []
+    }
+
+
+def is_stale(row: MovieMetadata) -> bool:
+    """Check a row against the staleness policy"""
+    fetched_at = row.fetched_at
+    if fetched_at is None:
+        return True
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - fetched_at > METADATA_MAX_AGE
+
+
+async def get_stored_metadata(db: AsyncSession, movie_ids: Iterable[int]) -> Dict[int, MovieMetadata]:
+    """Load stored metadata rows by movie ID, without touching TMDb"""
+    movie_ids = list(movie_ids)
+    if not movie_ids:
+        return {}
+    result = await db.execute(select(MovieMetadata).where(MovieMetadata.movie_id.in_(movie_ids)))
+    return {row.movie_id: row for row in result.scalars().all()}
+
+
+async def save_metadata(db: AsyncSession, metadata: dict):
+    """Insert or update a metadata row from a TMDb metadata dict"""
+    await db.merge(MovieMetadata(
+        movie_id=metadata["id"],
+        title=metadata["title"],
+        genres=metadata["genres"],
+        keywords=metadata["keywords"],
+        production_companies=metadata["production_companies"],
+        overview=metadata["overview"],
+        poster_path=metadata["poster_path"],
+        release_date=metadata["release_date"],
+        vote_average=metadata["vote_average"],
+        runtime=metadata["runtime"],
+        fetched_at=datetime.now(timezone.utc)
+    ))
+
+
+async def get_movie_metadata(db: AsyncSession, movie_ids: List[int]) -> Dict[int, dict]:
+    """Get metadata for many movies, populating the local store on first access
+
+    Fresh rows are served locally. Missing or stale rows are fetched from
+    TMDb concurrently; a stale row is still served if its refetch fails.
+    """
+    stored = await get_stored_metadata(db, movie_ids)
+    result = {movie_id: metadata_to_dict(row) for movie_id, row in stored.items() if not is_stale(row)}
+
+    to_fetch = [movie_id for movie_id in movie_ids if movie_id not in result]
+    if not to_fetch:
+        return result
+
+    fetched = await asyncio.gather(*(fetch_movie_metadata_from_tmdb(movie_id) for movie_id in to_fetch))
+
+    updated = False
+    for movie_id, metadata in zip(to_fetch, fetched):
+        if metadata:
+            await save_metadata(db, metadata)
+            result[movie_id] = metadata
+            updated = True
+        elif movie_id in stored:
+            result[movie_id] = metadata_to_dict(stored[movie_id])
+
+    if updated:
+        try:
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            logger.exception("Failed to store movie metadata")
+
+    return result
+
+
+async def refresh_stale_metadata(db: AsyncSession) -> int:
+    """Refetch the oldest stale rows from TMDb and return how many were updated
+
+    Rows that can't be refetched are postponed by METADATA_REFRESH_RETRY_AFTER.
+    """
+    cutoff = datetime.now(timezone.utc) - METADATA_MAX_AGE
+    result = await db.execute(
+        select(MovieMetadata.movie_id)
+        .where(MovieMetadata.fetched_at < cutoff)
+        .order_by(MovieMetadata.fetched_at)
+        .limit(METADATA_REFRESH_BATCH)
+    )
+    stale_ids = list(result.scalars().all())
+    if not stale_ids:
+        return 0
+
+    fetched = await asyncio.gather(*(fetch_movie_metadata_from_tmdb(movie_id) for movie_id in stale_ids))
+    refreshed = 0
+    failed = []
+    for movie_id, metadata in zip(stale_ids, fetched):
+        if metadata:
+            await save_metadata(db, metadata)
+            refreshed += 1
+        else:
+            failed.append(movie_id)
+
+    # Keep serving the stored row, and make it due again after the retry delay
+    if failed:
+        retry_at = datetime.now(timezone.utc) - METADATA_MAX_AGE + min(METADATA_REFRESH_RETRY_AFTER, METADATA_MAX_AGE)
+        await db.execute(update(MovieMetadata).where(MovieMetadata.movie_id.in_(failed)).values(fetched_at=retry_at))
+    await db.commit()
+    return refreshed
+
+
+async def run_metadata_refresher():
+    """Background task that keeps stored metadata within the staleness policy"""
+    while True:
+        await asyncio.sleep(METADATA_REFRESH_INTERVAL)
+        if not TMDB_API_KEY:
+            continue
+        async with AsyncSessionLocal() as db:
+            try:
+                refreshed = await refresh_stale_metadata(db)
+                if refreshed:
+                    logger.info("Refreshed metadata for %d movies", refreshed)
+            except Exception:
+                await db.rollback()
+                logger.exception("Movie metadata refresh failed")
@@ -0,0 +1,304 @@
+import asyncio
+import bisect
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from starlette.routing import Match, Router
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative bucketed histogram of observed values (in seconds)"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Record one observation"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative bucket counts keyed by upper bound, plus count and sum"""
+        cumulative = {}
+        running = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            running += bucket_count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = self.count
+        return {"buckets": cumulative, "count": self.count, "sum": round(self.sum, 6)}
+
+
+# Buckets for the number of SQL statements a request runs
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+class MetricFamily(ABC):
+    """A named metric with one child per combination of label values"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.children: Dict[Tuple[str, ...], Any] = {}
+
+    def labels(self, *values) -> Any:
+        """Child for the given label values, created on first use"""
+        key = tuple(str(value) for value in values)
+        child = self.children.get(key)
+        if child is None:
+            child = self.children.setdefault(key, self.new_child())
+        return child
+
+    @abstractmethod
+    def new_child(self) -> Any:
+        """Value holder for one combination of label values"""
+
+    @abstractmethod
+    def samples(self, key: Tuple[str, ...], child: Any) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        """(sample name, labels, value) lines for one child"""
+
+
+class Value:
+    """Single numeric value of a counter or gauge"""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+
+class Counter(MetricFamily):
+    type = "counter"
+
+    def new_child(self) -> Value:
+        return Value()
+
+    def samples(self, key, child):
+        yield self.name, dict(zip(self.labelnames, key)), child.value
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+
+class HistogramFamily(MetricFamily):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+
+    def new_child(self) -> Histogram:
+        return Histogram(self.buckets)
+
+    def samples(self, key, child):
+        labels = dict(zip(self.labelnames, key))
+        snapshot = child.snapshot()
+        for bound, count in snapshot["buckets"].items():
+            yield f"{self.name}_bucket", {**labels, "le": bound}, count
+        yield f"{self.name}_sum", labels, child.sum
+        yield f"{self.name}_count", labels, child.count
+
+
+http_requests = Counter(
+    "moview_http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+http_request_duration = HistogramFamily(
+    "moview_http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+http_requests_in_flight = Gauge(
+    "moview_http_requests_in_flight", "HTTP requests currently being served", ("method", "route")
+)
+http_request_db_statements = HistogramFamily(
+    "moview_http_request_db_statements", "SQL statements run per HTTP request", ("method", "route"), STATEMENT_BUCKETS
+)
+http_request_db_duration = HistogramFamily(
+    "moview_http_request_db_seconds", "Time spent in SQL statements per HTTP request", ("method", "route")
+)
+outbound_requests = Counter(
+    "moview_outbound_requests_total", "Calls to external APIs by outcome", ("service", "endpoint", "outcome")
+)
+outbound_request_duration = HistogramFamily(
+    "moview_outbound_request_duration_seconds", "Latency of calls to external APIs", ("service", "endpoint")
+)
+db_statements = Counter(
+    "moview_db_statements_total", "SQL statements run, including background work", ("engine",)
+)
+db_statement_duration = HistogramFamily(
+    "moview_db_statement_duration_seconds", "Latency of individual SQL statements", ("engine",)
+)
+
+REGISTRY: List[MetricFamily] = [
+    http_requests,
+    http_request_duration,
+    http_requests_in_flight,
+    http_request_db_statements,
+    http_request_db_duration,
+    outbound_requests,
+    outbound_request_duration,
+    db_statements,
+    db_statement_duration,
+]
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus(families: Sequence[MetricFamily] = REGISTRY) -> str:
+    """Render metric families in the Prometheus text exposition format"""
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.type}")
+        for key, child in list(family.children.items()):
+            for name, labels, value in family.samples(key, child):
+                if labels:
+                    label_text = ",".join(f'{label}="{escape_label(text)}"' for label, text in labels.items())
+                    lines.append(f"{name}{{{label_text}}} {format_value(value)}")
+                else:
+                    lines.append(f"{name} {format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def track_outbound(service: str, endpoint: str):
+    """Time a call to an external API and count it by outcome
+
+    Timeouts and other errors are counted separately and re-raised.
+    """
+    outcome = "success"
+    start = time.perf_counter()
+    try:
+        yield
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        raise
+    except (asyncio.CancelledError, GeneratorExit):
+        outcome = "cancelled"
+        raise
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        outbound_request_duration.labels(service, endpoint).observe(time.perf_counter() - start)
+        outbound_requests.labels(service, endpoint, outcome).inc()
+
+
+class RequestDbUsage:
+    """SQL statements and time accumulated by one HTTP request"""
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Usage of the request being served; copied into worker threads and the
+# greenlets SQLAlchemy runs async statements in, so statements are
+# attributed to the request that issued them
+current_db_usage: ContextVar[Optional[RequestDbUsage]] = ContextVar("current_db_usage", default=None)
+
+
+def instrument_engine(engine, name: str):
+    """Count and time every statement run on a (sync) SQLAlchemy engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def finish(conn):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        db_statements.labels(name).inc()
+        db_statement_duration.labels(name).observe(elapsed)
+        usage = current_db_usage.get()
+        if usage is not None:
+            usage.statements += 1
+            usage.seconds += elapsed
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        finish(conn)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        if exception_context.connection is not None:
+            finish(exception_context.connection)
+
+
+class MetricsMiddleware:
+    """Per-route latency, status, in-flight and SQL usage metrics
+
+    Requests are labelled with the route's path template (`/movies/{movie_id}`)
+    rather than the raw path, so label cardinality stays bounded; requests
+    that match no route share the `unmatched` label.
+    """
+
+    def __init__(self, app: ASGIApp, router: Router):
+        self.app = app
+        self.router = router
+
+    def route_template(self, scope: Scope) -> str:
+        partial = None
+        for route in self.router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+            if match == Match.PARTIAL and partial is None:
+                partial = route.path
+        return partial or "unmatched"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self.route_template(scope)
+        in_flight = http_requests_in_flight.labels(method, route)
+        usage = RequestDbUsage()
+        token = current_db_usage.set(usage)
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            http_request_duration.labels(method, route).observe(time.perf_counter() - start)
+            http_requests.labels(method, route, status).inc()
+            http_request_db_statements.labels(method, route).observe(usage.statements)
+            http_request_db_duration.labels(method, route).observe(usage.seconds)
+            current_db_usage.reset(token)
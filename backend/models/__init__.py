@@ -1,4 +1,8 @@
 from .user import User
 from .review import Review
+from .movie_metadata import MovieMetadata
+from .movie_stats import MovieStats
+from .movie_title import MovieTitle
+from .mirror_movie import MirrorMovie
 
-__all__ = ["User", "Review"] 
\ No newline at end of file
+__all__ = ["User", "Review", "MovieMetadata", "MovieStats", "MovieTitle", "MirrorMovie"]
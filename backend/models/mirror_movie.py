@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, Float, Boolean, DateTime, Text, Computed, Index
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.sql import func
+from database import Base
+
+
+class MirrorMovie(Base):
+    __tablename__ = "tmdb_mirror_movies"
+    
+    movie_id = Column(Integer, primary_key=True)  # TMDB movie ID
+    title = Column(Text, nullable=False)
+    normalized_title = Column(Text, nullable=False, index=True)  # See title_index.normalize_title
+    search_text = Column(Text, nullable=False)  # Normalized title and original title
+    search_vector = Column(TSVECTOR, Computed("to_tsvector('simple'::regconfig, search_text)", persisted=True))
+    popularity = Column(Float, nullable=False, default=0.0, index=True)
+    adult = Column(Boolean, nullable=False, default=False)
+    summary = Column(JSONB, nullable=False)  # List-view fields, as in TMDB search and popular results
+    details = Column(JSONB, nullable=False)  # Full TMDB movie details object from the dump
+    imported_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    # Prefix search over title words
+    __table_args__ = (
+        Index("ix_tmdb_mirror_movies_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    
+    def __repr__(self):
+        return f"<MirrorMovie(movie_id={self.movie_id}, title='{self.title}')>"
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, JSON
+from sqlalchemy.sql import func
+from database import Base
+
+
+class MovieMetadata(Base):
+    __tablename__ = "movie_metadata"
+    
+    movie_id = Column(Integer, primary_key=True)  # TMDB movie ID
+    title = Column(String, nullable=False)
+    genres = Column(JSON, nullable=False, default=list)
+    keywords = Column(JSON, nullable=False, default=list)
+    production_companies = Column(JSON, nullable=False, default=list)
+    overview = Column(Text, nullable=True)
+    poster_path = Column(String, nullable=True)
+    release_date = Column(String, nullable=True)
+    vote_average = Column(Float, nullable=True)
+    runtime = Column(Integer, nullable=True)
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<MovieMetadata(movie_id={self.movie_id}, title='{self.title}')>"
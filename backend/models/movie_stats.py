@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, Float, DateTime
+from sqlalchemy.sql import func
+from database import Base
+
+
+class MovieStats(Base):
+    __tablename__ = "movie_stats"
+    
+    movie_id = Column(Integer, primary_key=True)  # TMDB movie ID
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    review_count = Column(Integer, nullable=False, default=0)
+    
+    # Rating histogram, bucketed by whole stars (4.5 counts as 4)
+    stars_1 = Column(Integer, nullable=False, default=0)
+    stars_2 = Column(Integer, nullable=False, default=0)
+    stars_3 = Column(Integer, nullable=False, default=0)
+    stars_4 = Column(Integer, nullable=False, default=0)
+    stars_5 = Column(Integer, nullable=False, default=0)
+    
+    # Sentiment breakdown
+    positive_count = Column(Integer, nullable=False, default=0)
+    negative_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    @property
+    def average_rating(self) -> float:
+        return self.rating_sum / self.review_count if self.review_count else 0.0
+    
+    def __repr__(self):
+        return f"<MovieStats(movie_id={self.movie_id}, review_count={self.review_count})>"
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text
+from sqlalchemy.sql import func
+from database import Base
+
+
+class MovieTitle(Base):
+    __tablename__ = "movie_titles"
+    
+    normalized_title = Column(String, primary_key=True)  # See title_index.normalize_title
+    movie_id = Column(Integer, nullable=False, index=True)  # TMDB movie ID of the best search match
+    title = Column(String, nullable=False)
+    poster_path = Column(String, nullable=True)
+    overview = Column(Text, nullable=True)
+    release_date = Column(String, nullable=True)
+    vote_average = Column(Float, nullable=True)
+    resolved_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<MovieTitle(normalized_title='{self.normalized_title}', movie_id={self.movie_id})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -20,5 +20,13 @@ class Review(Base):
     # Relationship to User
     user = relationship("User", backref="reviews")
     
+    # One review per user per movie, and newest-first keyset pagination per
+    # movie and per user
+    __table_args__ = (
+        Index("uq_reviews_user_id_movie_id", "user_id", "movie_id", unique=True),
+        Index("ix_reviews_movie_id_created_at_id", "movie_id", "created_at", "id"),
+        Index("ix_reviews_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+    
     def __repr__(self):
         return f"<Review(movie_id={self.movie_id}, rating={self.rating}, sentiment='{self.sentiment}')>" 
\ No newline at end of file
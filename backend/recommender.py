@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import os
+import numpy as np
+from scipy import sparse
+from typing import Dict, Iterable, List, Optional, Tuple
+from database import SessionLocal
+from models.review import Review
+
+logger = logging.getLogger(__name__)
+
+# Item-item collaborative filtering settings
+CF_NEIGHBORS = int(os.getenv("CF_NEIGHBORS", "50"))
+CF_REBUILD_INTERVAL = float(os.getenv("CF_REBUILD_INTERVAL", "900"))
+
+# Ratings are centred on the middle of the 1-5 scale, so liked movies pull
+# similar movies up and disliked movies push them down
+RATING_MIDPOINT = 3.0
+
+
+class ItemItemRecommender:
+    """Item-item collaborative filtering over the reviews table
+
+    Builds a sparse user x movie matrix of centred ratings, computes cosine
+    similarity between movie columns and keeps the top `neighbors` most
+    similar movies per movie. Scoring a user is a sparse vector product.
+    """
+
+    def __init__(self, neighbors: int = CF_NEIGHBORS):
+        self.neighbors = neighbors
+        self.movie_ids = np.array([], dtype=np.int64)
+        self._movie_index: Dict[int, int] = {}
+        self._similarity = sparse.csr_matrix((0, 0))
+
+    def __len__(self) -> int:
+        return len(self.movie_ids)
+
+    def fit(self, ratings: Iterable[Tuple[object, int, float]]) -> "ItemItemRecommender":
+        """Compute item similarities from (user_id, movie_id, rating) rows"""
+        rows = list(ratings)
+        if not rows:
+            return self
+
+        user_keys = np.array([str(user_id) for user_id, _, _ in rows])
+        movie_keys = np.array([movie_id for _, movie_id, _ in rows], dtype=np.int64)
+        values = np.array([rating for _, _, rating in rows], dtype=np.float64) - RATING_MIDPOINT
+
+        users, user_idx = np.unique(user_keys, return_inverse=True)
+        self.movie_ids, movie_idx = np.unique(movie_keys, return_inverse=True)
+        self._movie_index = {int(movie_id): i for i, movie_id in enumerate(self.movie_ids)}
+
+        matrix = sparse.csr_matrix((values, (user_idx, movie_idx)), shape=(len(users), len(self.movie_ids)))
+
+        # Cosine similarity between movie columns
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+        norms[norms == 0] = 1.0
+        normalized = matrix @ sparse.diags(1.0 / norms)
+        similarity = (normalized.T @ normalized).tocsr()
+        similarity.setdiag(0)
+        similarity.eliminate_zeros()
+
+        self._similarity = self._keep_top_neighbors(similarity)
+        return self
+
+    def _keep_top_neighbors(self, similarity: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Keep only the most similar positively-correlated movies per row"""
+        rows, cols, data = [], [], []
+        for i in range(similarity.shape[0]):
+            start, end = similarity.indptr[i], similarity.indptr[i + 1]
+            row_data = similarity.data[start:end]
+            row_cols = similarity.indices[start:end]
+
+            positive = row_data > 0
+            row_data, row_cols = row_data[positive], row_cols[positive]
+            if len(row_data) > self.neighbors:
+                top = np.argpartition(-row_data, self.neighbors)[:self.neighbors]
+                row_data, row_cols = row_data[top], row_cols[top]
+
+            rows.append(np.full(len(row_data), i))
+            cols.append(row_cols)
+            data.append(row_data)
+
+        if not rows:
+            return sparse.csr_matrix(similarity.shape)
+        return sparse.csr_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=similarity.shape
+        )
+
+    def recommend(self, user_ratings: Dict[int, float], k: int = 10) -> List[Tuple[int, float, int]]:
+        """Top-k unseen movies for a user's ratings
+
+        Returns (movie_id, score, because_movie_id) tuples, where
+        because_movie_id is the rated movie that contributed most to the score.
+        """
+        known = [(self._movie_index[movie_id], rating - RATING_MIDPOINT)
+                 for movie_id, rating in user_ratings.items() if movie_id in self._movie_index]
+        if not known:
+            return []
+
+        rated_idx = np.array([idx for idx, _ in known])
+        weights = np.array([weight for _, weight in known])
+
+        neighbors = self._similarity[rated_idx]
+        scores = np.asarray(neighbors.T @ weights).ravel()
+        scores[rated_idx] = 0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) == 0:
+            return []
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates])]
+
+        contributions = neighbors[:, candidates].toarray() * weights[:, None]
+        because = rated_idx[np.argmax(contributions, axis=0)]
+
+        return [
+            (int(self.movie_ids[j]), float(scores[j]), int(self.movie_ids[b]))
+            for j, b in zip(candidates, because)
+        ]
+
+
+# Current engine, swapped atomically after each rebuild
+_engine: Optional[ItemItemRecommender] = None
+
+
+def get_engine() -> Optional[ItemItemRecommender]:
+    """Get the latest built engine, or None before the first build"""
+    return _engine
+
+
+def build_engine() -> ItemItemRecommender:
+    """Load all ratings from the database and fit a new engine"""
+    db = SessionLocal()
+    try:
+        rows = db.query(Review.user_id, Review.movie_id, Review.rating).all()
+    finally:
+        db.close()
+    return ItemItemRecommender().fit(rows)
+
+
+async def rebuild_engine():
+    """Fit a new engine off the event loop and swap it in"""
+    global _engine
+    loop = asyncio.get_running_loop()
+    _engine = await loop.run_in_executor(None, build_engine)
+    logger.info("Collaborative filtering engine rebuilt with %d movies", len(_engine))
+
+
+async def run_engine_refresher():
+    """Background task that rebuilds item similarities on a schedule"""
+    while True:
+        try:
+            await rebuild_engine()
+        except Exception:
+            logger.exception("Collaborative filtering rebuild failed")
+        await asyncio.sleep(CF_REBUILD_INTERVAL)
+
+
+def recommend_for_user(user_ratings: Dict[int, float], k: int = 10) -> List[Tuple[int, float, int]]:
+    """Top-k recommendations from the current engine, empty until it is built"""
+    engine = get_engine()
+    if engine is None:
+        return []
+    return engine.recommend(user_ratings, k)
@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+import os
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# JSON bodies at least this large are gzip-compressed for clients that accept it
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+
+
+def accepts_gzip(request_headers: Headers) -> bool:
+    """Whether the Accept-Encoding header allows gzip"""
+    for coding in request_headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def matches_etag(if_none_match: str, tag: str) -> bool:
+    """Weak If-None-Match comparison against an entity tag, ignoring the encoding suffix"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"').removesuffix("-gzip") == tag:
+            return True
+    return False
+
+
+class ConditionalResponseMiddleware:
+    """Strong ETags, conditional GETs and gzip compression for JSON responses
+
+    Successful JSON GET responses get an ETag derived from their content and
+    `Cache-Control: no-cache`, so browsers revalidate and get an empty 304
+    when nothing changed. JSON bodies of at least `minimum_size` bytes are
+    gzip-compressed; the compressed representation has its own ETag. Other
+    responses, such as server-sent event streams, pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = GZIP_MIN_SIZE, compresslevel: int = GZIP_LEVEL):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        start_message = None
+        body_parts = []
+        passthrough = False
+
+        async def buffered_send(message: Message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                content_type = Headers(raw=message["headers"]).get("content-type", "")
+                if content_type.startswith("application/json"):
+                    start_message = message
+                else:
+                    passthrough = True
+                    await send(message)
+            elif message["type"] == "http.response.body" and not passthrough:
+                body_parts.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await self.send_response(scope, request_headers, start_message, b"".join(body_parts), send)
+            else:
+                await send(message)
+
+        await self.app(scope, receive, buffered_send)
+
+    async def send_response(self, scope: Scope, request_headers: Headers, start_message: Message, body: bytes, send: Send):
+        headers = MutableHeaders(raw=list(start_message["headers"]))
+        status = start_message["status"]
+
+        compressible = len(body) >= self.minimum_size and "content-encoding" not in headers
+        use_gzip = compressible and accepts_gzip(request_headers)
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+
+        if scope["method"] == "GET" and status == 200:
+            tag = hashlib.blake2b(body, digest_size=16).hexdigest()
+            headers["ETag"] = f'"{tag}-gzip"' if use_gzip else f'"{tag}"'
+            headers.setdefault("Cache-Control", "no-cache")
+
+            if matches_etag(request_headers.get("if-none-match", ""), tag):
+                del headers["content-length"]
+                del headers["content-type"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        if use_gzip:
+            # mtime=0 keeps the compressed bytes identical for identical bodies
+            body = gzip.compress(body, compresslevel=self.compresslevel, mtime=0)
+            headers["Content-Encoding"] = "gzip"
+            headers["Content-Length"] = str(len(body))
+
+        await send({"type": "http.response.start", "status": status, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
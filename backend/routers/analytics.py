@@ -0,0 +1,45 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Dict, Optional
+from analytics import get_analytics
+
+router = APIRouter()
+
+# Maximum number of movies per analytics request
+ANALYTICS_MAX_MOVIES = 500
+
+@router.get("/overview")
+async def get_overview() -> Dict[str, Any]:
+    """Catalogue-wide sentiment distribution, rating histograms and agreement
+
+    `agreement_rate` is the share of scored reviews whose sentiment matches
+    their star rating (4-5 positive, 3 neutral, 1-2 negative).
+    """
+    analytics = await get_analytics()
+    return analytics.overview()
+
+@router.get("/movies")
+async def get_movie_analytics(
+    ids: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=ANALYTICS_MAX_MOVIES)
+) -> Dict[str, Any]:
+    """Per-movie sentiment and rating aggregates
+
+    `ids` is a comma-separated list of TMDb movie IDs. Without it the `limit`
+    most reviewed movies are returned.
+    """
+    analytics = await get_analytics()
+
+    if ids is None:
+        return {"movies": analytics.top_movies(limit), "generated_at": analytics.built_at}
+
+    try:
+        movie_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+
+    if not movie_ids:
+        raise HTTPException(status_code=400, detail="At least one movie ID is required")
+    if len(movie_ids) > ANALYTICS_MAX_MOVIES:
+        raise HTTPException(status_code=400, detail=f"At most {ANALYTICS_MAX_MOVIES} movie IDs are allowed per request")
+
+    return {"movies": [analytics.movie(movie_id) for movie_id in movie_ids], "generated_at": analytics.built_at}
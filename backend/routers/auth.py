@@ -1,30 +1,60 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr, Field
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import logging
 import os
-from typing import Optional
+from typing import Optional, Tuple
 
-from database import get_db
+from database import AsyncSessionLocal, get_async_db
 from models.user import User
+from cache import TTLCache
 import uuid
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Security configurations
 SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secret-jwt-key-here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 24 * 60  # 24 hours
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing. Stored hashes with a different bcrypt cost are rehashed
+# at BCRYPT_ROUNDS on the user's next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS
+)
+
+# bcrypt releases the GIL, so hashing runs on a dedicated thread pool that
+# spreads the work across cores and keeps the event loop free. The pool size
+# bounds how many hashes run at once.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
 
 # JWT token scheme
 security = HTTPBearer()
 
+# Authenticated user snapshots by token subject (email), so validating a token
+# needs no database query. The TTL bounds how long a changed or deleted user
+# can still be served from memory and is far shorter than the token expiry.
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+user_cache = TTLCache(
+    max_entries=int(os.getenv("AUTH_USER_CACHE_MAX_ENTRIES", "10000")),
+    default_ttl=AUTH_USER_CACHE_TTL
+)
+
 # Pydantic models
 class UserRegister(BaseModel):
     username: str = Field(..., min_length=3, max_length=50, description="Username")
@@ -52,13 +82,18 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 # Helper functions
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password against its hash off the event loop
 
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+    Also returns a replacement hash when the stored one needs upgrading.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash(password: str) -> str:
+    """Hash a password off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
@@ -71,16 +106,58 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_user_by_email(db: Session, email: str):
+async def get_user_by_email(db: AsyncSession, email: str):
     """Get user by email"""
-    return db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
-def get_user_by_username(db: Session, username: str):
+async def get_user_by_username(db: AsyncSession, username: str):
     """Get user by username"""
-    return db.query(User).filter(User.username == username).first()
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
+
+def user_snapshot(user: User) -> dict:
+    """A user's public fields, as cached for get_current_user"""
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "created_at": user.created_at
+    }
+
+def cache_user(user: User):
+    """Store a snapshot of a user's public fields for get_current_user"""
+    user_cache.set(user.email, user_snapshot(user))
+
+def invalidate_cached_user(email: str):
+    """Drop a user's snapshot; call after changing or deleting the user"""
+    user_cache.invalidate(email)
+
+def clear_user_cache():
+    """Drop every cached user snapshot"""
+    user_cache.clear()
+
+# Any change to a user through the ORM evicts its snapshot: flushed updates
+# and deletes by the emails involved, bulk UPDATE/DELETE statements on users
+# (whose rows aren't known) by clearing the whole cache
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_changed_user(mapper, connection, target: User):
+    invalidate_cached_user(target.email)
+    for previous_email in inspect(target).attrs.email.history.deleted:
+        invalidate_cached_user(previous_email)
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    """Get current authenticated user from JWT token"""
+@event.listens_for(Session, "do_orm_execute")
+def invalidate_bulk_changed_users(orm_execute_state):
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and orm_execute_state.bind_mapper is inspect(User):
+        clear_user_cache()
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Get current authenticated user from JWT token
+
+    Served from the user snapshot cache when possible. The returned User is
+    not attached to a database session.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -95,25 +172,31 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except JWTError:
         raise credentials_exception
     
-    user = get_user_by_email(db, email=token_data.email)
+    snapshot = user_cache.get(token_data.email)
+    if snapshot is not None:
+        return User(**snapshot)
+    
+    async with AsyncSessionLocal() as db:
+        user = await get_user_by_email(db, email=token_data.email)
     if user is None:
         raise credentials_exception
+    cache_user(user)
     return user
 
 # Authentication endpoints
 @router.post("/register", response_model=UserResponse)
-async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register_user(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     try:
         # Check if user already exists
-        existing_user_email = get_user_by_email(db, user_data.email)
+        existing_user_email = await get_user_by_email(db, user_data.email)
         if existing_user_email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
         
-        existing_user_username = get_user_by_username(db, user_data.username)
+        existing_user_username = await get_user_by_username(db, user_data.username)
         if existing_user_username:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -121,7 +204,7 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
             )
         
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash(user_data.password)
         new_user = User(
             id=uuid.uuid4(),
             username=user_data.username,
@@ -130,8 +213,11 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
         )
         
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
+        
+        # A deleted account with the same email may still be cached
+        invalidate_cached_user(new_user.email)
         
         return UserResponse(
             id=str(new_user.id),
@@ -141,7 +227,7 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
         )
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         if isinstance(e, HTTPException):
             raise e
         raise HTTPException(
@@ -150,20 +236,39 @@ async def register_user(user_data: UserRegister, db: Session = Depends(get_db)):
         )
 
 @router.post("/login", response_model=Token)
-async def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login_user(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Authenticate user and return JWT token"""
-    user = get_user_by_email(db, user_data.email)
+    user = await get_user_by_email(db, user_data.email)
     
-    if not user or not verify_password(user_data.password, user.password):
+    valid, new_hash = await verify_password(user_data.password, user.password) if user else (False, None)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Read before the upgrade commit: a rollback expires the loaded user
+    email = user.email
+    snapshot = user_snapshot(user)
+    
+    # Store the rehashed password if the bcrypt cost has changed; a failure
+    # here should not fail the login
+    if new_hash:
+        try:
+            user.password = new_hash
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            logger.exception("Failed to upgrade password hash")
+    
+    # The frontend asks for the current user right after logging in; cached
+    # after the upgrade commit, which evicts the user's snapshot
+    user_cache.set(email, snapshot)
+    
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": email}, expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
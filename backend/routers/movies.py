@@ -1,34 +1,71 @@
 from fastapi import APIRouter, HTTPException
-import requests
+import asyncio
+import httpx
 import os
 from typing import List, Dict, Any
+from cache import TTLCache
+import tmdb_client
+from tmdb_client import TMDB_API_KEY, tmdb_get
+import tmdb_mirror
+from tmdb_mirror import TMDB_MIRROR_MODE
 
 router = APIRouter()
 
-# TMDb API configuration
-TMDB_API_KEY = os.getenv("TMDB_API_KEY")
-TMDB_BASE_URL = "https://api.themoviedb.org/3"
+# TMDb image configuration
 TMDB_IMAGE_BASE_URL = "https://image.tmdb.org/t/p/w500"
 
+# Response cache configuration (TTLs in seconds)
+POPULAR_CACHE_TTL = float(os.getenv("MOVIES_POPULAR_CACHE_TTL", "600"))
+SEARCH_CACHE_TTL = float(os.getenv("MOVIES_SEARCH_CACHE_TTL", "300"))
+DETAILS_CACHE_TTL = float(os.getenv("MOVIES_DETAILS_CACHE_TTL", "3600"))
+
+# Enriched responses are cached, so hits skip both TMDb and the image URL loop
+movie_cache = TTLCache(
+    max_entries=int(os.getenv("MOVIES_CACHE_MAX_ENTRIES", "2000")),
+    max_bytes=int(os.getenv("MOVIES_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+)
+
+# Batch endpoint limits
+BATCH_MAX_IDS = int(os.getenv("MOVIES_BATCH_MAX_IDS", "500"))
+BATCH_CONCURRENCY = int(os.getenv("MOVIES_BATCH_CONCURRENCY", "8"))
+
+# Fields returned per movie by the batch endpoint
+SUMMARY_FIELDS = [
+    "id", "title", "overview", "release_date", "runtime", "vote_average", "genres",
+    "poster_path", "backdrop_path", "poster_url", "backdrop_url"
+]
+
+@router.get("/cache/stats")
+async def get_cache_stats() -> Dict[str, Any]:
+    """Get hit/miss counters and size of the movie response cache
+
+    `coalesced_requests` counts TMDb calls that joined an identical fetch
+    already in flight instead of making their own.
+    """
+    return {**movie_cache.stats(), "coalesced_requests": tmdb_client.coalesced_requests}
+
 @router.get("/popular")
 async def get_popular_movies(page: int = 1) -> Dict[str, Any]:
-    """Get popular movies from TMDb API"""
-    if not TMDB_API_KEY:
+    """Get popular movies from TMDb API, or from the local mirror in mirror mode"""
+    if not (TMDB_API_KEY or TMDB_MIRROR_MODE):
         raise HTTPException(status_code=500, detail="TMDb API key not configured")
     
+    cache_key = ("popular", page)
+    cached = movie_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
-        url = f"{TMDB_BASE_URL}/movie/popular"
         params = {
-            "api_key": TMDB_API_KEY,
             "page": page,
             "language": "en-US",
             "include_adult": False
         }
         
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        
-        data = response.json()
+        if TMDB_MIRROR_MODE:
+            data = await tmdb_mirror.popular_movies(page)
+        else:
+            data = await tmdb_get("/movie/popular", params)
         
         # Add full image URLs to the response
         for movie in data.get("results", []):
@@ -37,34 +74,38 @@ async def get_popular_movies(page: int = 1) -> Dict[str, Any]:
             if movie.get("backdrop_path"):
                 movie["backdrop_url"] = f"https://image.tmdb.org/t/p/w1280{movie['backdrop_path']}"
         
+        movie_cache.set(cache_key, data, ttl=POPULAR_CACHE_TTL)
         return data
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch movies: {str(e)}")
 
 @router.get("/search")
 async def search_movies(q: str, page: int = 1) -> Dict[str, Any]:
     """Search movies by title"""
-    if not TMDB_API_KEY:
+    if not (TMDB_API_KEY or TMDB_MIRROR_MODE):
         raise HTTPException(status_code=500, detail="TMDb API key not configured")
     
     if not q.strip():
         raise HTTPException(status_code=400, detail="Search query cannot be empty")
     
+    cache_key = ("search", q.strip().lower(), page)
+    cached = movie_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
-        url = f"{TMDB_BASE_URL}/search/movie"
         params = {
-            "api_key": TMDB_API_KEY,
             "query": q,
             "page": page,
             "language": "en-US",
             "include_adult": False
         }
         
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        
-        data = response.json()
+        if TMDB_MIRROR_MODE:
+            data = await tmdb_mirror.search_movies(q, page)
+        else:
+            data = await tmdb_get("/search/movie", params)
         
         # Add full image URLs to the response
         for movie in data.get("results", []):
@@ -73,29 +114,94 @@ async def search_movies(q: str, page: int = 1) -> Dict[str, Any]:
             if movie.get("backdrop_path"):
                 movie["backdrop_url"] = f"https://image.tmdb.org/t/p/w1280{movie['backdrop_path']}"
         
+        movie_cache.set(cache_key, data, ttl=SEARCH_CACHE_TTL)
         return data
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Failed to search movies: {str(e)}")
 
+@router.get("/batch")
+async def get_movies_batch(ids: str) -> Dict[str, Any]:
+    """Get summary details for many movies in one request
+
+    `ids` is a comma-separated list of TMDb movie IDs. Cached movies are served
+    locally and the rest are fetched concurrently from TMDb. Movies TMDb doesn't
+    have (or adult movies) are listed in `not_found`; movies that couldn't be
+    fetched because of an upstream error are listed in `failed` and can be retried.
+    """
+    if not (TMDB_API_KEY or TMDB_MIRROR_MODE):
+        raise HTTPException(status_code=500, detail="TMDb API key not configured")
+    
+    try:
+        movie_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    
+    if not movie_ids:
+        raise HTTPException(status_code=400, detail="At least one movie ID is required")
+    if len(movie_ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_IDS} movie IDs are allowed per request")
+    
+    movies = {}
+    misses = []
+    for movie_id in movie_ids:
+        cached = movie_cache.get(("details", movie_id))
+        if cached is not None:
+            movies[movie_id] = movie_summary(cached)
+        else:
+            misses.append(movie_id)
+    
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def fetch(movie_id: int):
+        async with semaphore:
+            try:
+                return movie_id, await fetch_movie_details(movie_id), None
+            except HTTPException as e:
+                return movie_id, None, e.status_code
+    
+    not_found = []
+    failed = []
+    for movie_id, data, status_code in await asyncio.gather(*(fetch(movie_id) for movie_id in misses)):
+        if data is not None:
+            movies[movie_id] = movie_summary(data)
+        elif status_code in (403, 404):
+            not_found.append(movie_id)
+        else:
+            failed.append(movie_id)
+    
+    return {
+        "movies": {str(movie_id): movies[movie_id] for movie_id in movie_ids if movie_id in movies},
+        "not_found": not_found,
+        "failed": failed
+    }
+
 @router.get("/{movie_id}")
 async def get_movie_details(movie_id: int) -> Dict[str, Any]:
     """Get detailed information about a specific movie"""
-    if not TMDB_API_KEY:
+    if not (TMDB_API_KEY or TMDB_MIRROR_MODE):
         raise HTTPException(status_code=500, detail="TMDb API key not configured")
     
+    cached = movie_cache.get(("details", movie_id))
+    if cached is not None:
+        return cached
+    
+    return await fetch_movie_details(movie_id)
+
+async def fetch_movie_details(movie_id: int) -> Dict[str, Any]:
+    """Fetch movie details from TMDb, enrich image URLs and cache the result"""
     try:
-        url = f"{TMDB_BASE_URL}/movie/{movie_id}"
         params = {
-            "api_key": TMDB_API_KEY,
             "language": "en-US",
             "append_to_response": "credits,videos,reviews"
         }
         
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        
-        data = response.json()
+        if TMDB_MIRROR_MODE:
+            data = await tmdb_mirror.movie_details(movie_id)
+            if data is None:
+                raise HTTPException(status_code=404, detail="Movie not found")
+        else:
+            data = await tmdb_get(f"/movie/{movie_id}", params)
 
         if data.get("adult"):
             raise HTTPException(status_code=403, detail="Adult content is not allowed")
@@ -106,9 +212,14 @@ async def get_movie_details(movie_id: int) -> Dict[str, Any]:
         if data.get("backdrop_path"):
             data["backdrop_url"] = f"https://image.tmdb.org/t/p/w1280{data['backdrop_path']}"
         
+        movie_cache.set(("details", movie_id), data, ttl=DETAILS_CACHE_TTL)
         return data
         
-    except requests.RequestException as e:
-        if e.response and e.response.status_code == 404:
+    except httpx.HTTPError as e:
+        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 404:
             raise HTTPException(status_code=404, detail="Movie not found")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch movie details: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to fetch movie details: {str(e)}")
+
+def movie_summary(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the fields list views need from a full movie details payload"""
+    return {field: data.get(field) for field in SUMMARY_FIELDS}
@@ -1,46 +1,34 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Optional
 from pydantic import BaseModel, Field
-from database import get_db
+from database import AsyncSessionLocal, get_async_db
 from models.review import Review
 from models.user import User
+from models.movie_stats import MovieStats
 import uuid
 import os
-import requests
+import base64
 import asyncio
+import hashlib
+import json
 from datetime import datetime
-from groq import Groq
+from cache import TTLCache
+from llm_client import JsonObjectStream, chat_completion, stream_chat_completion
+from title_index import resolve_title, resolve_titles
+from metadata_store import get_movie_metadata, get_stored_metadata
+from recommender import recommend_for_user
+from stats_store import movie_stats_upsert, stats_to_dict
+from sentiment_analyzer import simple_sentiment_analysis
 
 router = APIRouter()
 
-def simple_sentiment_analysis(text: str) -> str:
-    """Simple sentiment analysis based on keywords"""
-    text_lower = text.lower()
-    
-    positive_words = [
-        'good', 'great', 'excellent', 'amazing', 'love', 'best', 'awesome', 
-        'fantastic', 'wonderful', 'brilliant', 'outstanding', 'superb', 
-        'incredible', 'perfect', 'beautiful', 'stunning', 'masterpiece',
-        'enjoyable', 'entertaining', 'impressive', 'remarkable', 'exceptional'
-    ]
-    
-    negative_words = [
-        'bad', 'terrible', 'awful', 'hate', 'worst', 'horrible', 
-        'disappointing', 'boring', 'poor', 'waste', 'pathetic', 'garbage',
-        'stupid', 'ridiculous', 'annoying', 'frustrating', 'dreadful',
-        'mediocre', 'overrated', 'bland', 'tedious', 'unwatchable'
-    ]
-    
-    positive_score = sum(1 for word in positive_words if word in text_lower)
-    negative_score = sum(1 for word in negative_words if word in text_lower)
-    
-    if positive_score > negative_score:
-        return 'positive'
-    elif negative_score > positive_score:
-        return 'negative'
-    else:
-        return 'neutral'
+# PostgreSQL SQLSTATE for a foreign key violation
+FOREIGN_KEY_VIOLATION = "23503"
 
 # Pydantic models for request/response
 class ReviewCreate(BaseModel):
@@ -62,6 +50,9 @@ class ReviewResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class StatsBatchRequest(BaseModel):
+    movie_ids: List[int] = Field(..., min_length=1, max_length=500, description="TMDB Movie IDs")
+
 class RecommendedMovie(BaseModel):
     movie_id: int
     title: str
@@ -76,65 +67,117 @@ class RecommendationResponse(BaseModel):
     recommendations: List[RecommendedMovie]
 
 @router.post("/", response_model=ReviewResponse)
-async def create_review(review_data: ReviewCreate, db: Session = Depends(get_db)):
+async def create_review(review_data: ReviewCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new review for a movie"""
     try:
-        # Verify user exists
-        user = db.query(User).filter(User.id == review_data.user_id).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        # Check if user has already reviewed this movie
-        existing_review = db.query(Review).filter(
-            Review.user_id == review_data.user_id,
-            Review.movie_id == review_data.movie_id
-        ).first()
-        
-        if existing_review:
-            raise HTTPException(status_code=400, detail="User has already reviewed this movie")
-        
-        # Create new review
-        new_review = Review(
-            user_id=review_data.user_id,
+        user_id = uuid.UUID(review_data.user_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Perform sentiment analysis using simple keyword-based method
+    sentiment = simple_sentiment_analysis(review_data.content)
+    
+    # Insert the review, add it to the movie's aggregates and look up the
+    # author's username in a single statement. The unique index skips a
+    # duplicate review and the users foreign key rejects an unknown user.
+    inserted = (
+        pg_insert(Review)
+        .values(
+            id=uuid.uuid4(),
+            user_id=user_id,
             movie_id=review_data.movie_id,
             content=review_data.content,
-            rating=review_data.rating
-        )
-        
-        db.add(new_review)
-        db.commit()
-        db.refresh(new_review)
-        
-        # Perform sentiment analysis using simple keyword-based method
-        new_review.sentiment = simple_sentiment_analysis(review_data.content)
-        
-        # Prepare response
-        response = ReviewResponse(
-            id=str(new_review.id),
-            user_id=str(new_review.user_id),
-            movie_id=new_review.movie_id,
-            content=new_review.content,
-            rating=new_review.rating,
-            sentiment=new_review.sentiment,
-            created_at=new_review.created_at,
-            username=user.username
+            rating=review_data.rating,
+            sentiment=sentiment
         )
-        
-        return response
-        
+        .on_conflict_do_nothing(index_elements=[Review.user_id, Review.movie_id])
+        .returning(*Review.__table__.c)
+        .cte("inserted")
+    )
+    stats_update = movie_stats_upsert(inserted).cte("stats_update")
+    statement = (
+        select(inserted, User.username)
+        .join(User, User.id == inserted.c.user_id)
+        .add_cte(stats_update)
+    )
+    
+    try:
+        row = (await db.execute(statement)).first()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if getattr(e.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION:
+            raise HTTPException(status_code=404, detail="User not found")
+        raise HTTPException(status_code=500, detail=f"Failed to create review: {str(e)}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create review: {str(e)}")
+    
+    if row is None:
+        raise HTTPException(status_code=400, detail="User has already reviewed this movie")
+    
+    # The user's review set changed, so cached recommendations are out of date
+    invalidate_recommendations(str(user_id))
+    
+    # Prepare response
+    return ReviewResponse(
+        id=str(row.id),
+        user_id=str(row.user_id),
+        movie_id=row.movie_id,
+        content=row.content,
+        rating=row.rating,
+        sentiment=row.sentiment,
+        created_at=row.created_at,
+        username=row.username
+    )
+
+# Review list pagination
+REVIEWS_PAGE_SIZE = 20
+REVIEWS_MAX_PAGE_SIZE = 100
+
+def encode_cursor(review: Review) -> str:
+    """Opaque cursor pointing just past a review in (created_at, id) order"""
+    return base64.urlsafe_b64encode(f"{review.created_at.isoformat()}|{review.id}".encode()).decode()
+
+def decode_cursor(cursor: str):
+    """Decode a cursor back into its (created_at, id) position"""
+    try:
+        created_at, review_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(review_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate_reviews(query, cursor: Optional[str], limit: int):
+    """Apply newest-first keyset pagination; fetches one extra row to detect a next page"""
+    if cursor:
+        created_at, review_id = decode_cursor(cursor)
+        query = query.where(tuple_(Review.created_at, Review.id) < tuple_(created_at, review_id))
+    return query.order_by(Review.created_at.desc(), Review.id.desc()).limit(limit + 1)
 
 @router.get("/{movie_id}", response_model=List[ReviewResponse])
-async def get_movie_reviews(movie_id: int, db: Session = Depends(get_db)):
-    """Get all reviews for a specific movie"""
+async def get_movie_reviews(
+    movie_id: int,
+    response: Response,
+    limit: int = Query(REVIEWS_PAGE_SIZE, ge=1, le=REVIEWS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a page of reviews for a specific movie, newest first
+    
+    Pass the X-Next-Cursor response header back as `cursor` to get the next page.
+    """
+    query = paginate_reviews(select(Review, User).join(User).where(Review.movie_id == movie_id), cursor, limit)
     try:
-        reviews = db.query(Review, User).join(User).filter(Review.movie_id == movie_id).all()
+        result = await db.execute(query)
+        reviews = result.all()
+        
+        if len(reviews) > limit:
+            reviews = reviews[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor(reviews[-1][0])
         
-        response = []
+        page = []
         for review, user in reviews:
-            response.append(ReviewResponse(
+            page.append(ReviewResponse(
                 id=str(review.id),
                 user_id=str(review.user_id),
                 movie_id=review.movie_id,
@@ -145,24 +188,39 @@ async def get_movie_reviews(movie_id: int, db: Session = Depends(get_db)):
                 username=user.username
             ))
         
-        return response
+        return page
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch reviews: {str(e)}")
 
 @router.get("/user/{user_id}", response_model=List[ReviewResponse])
-async def get_user_reviews(user_id: str, db: Session = Depends(get_db)):
-    """Get all reviews by a specific user"""
+async def get_user_reviews(
+    user_id: str,
+    response: Response,
+    limit: int = Query(REVIEWS_PAGE_SIZE, ge=1, le=REVIEWS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a page of reviews by a specific user, newest first
+    
+    Pass the X-Next-Cursor response header back as `cursor` to get the next page.
+    """
     try:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, uuid.UUID(user_id))
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        reviews = db.query(Review).filter(Review.user_id == user_id).all()
+        query = paginate_reviews(select(Review).where(Review.user_id == user.id), cursor, limit)
+        result = await db.execute(query)
+        reviews = result.scalars().all()
+        
+        if len(reviews) > limit:
+            reviews = reviews[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor(reviews[-1])
         
-        response = []
+        page = []
         for review in reviews:
-            response.append(ReviewResponse(
+            page.append(ReviewResponse(
                 id=str(review.id),
                 user_id=str(review.user_id),
                 movie_id=review.movie_id,
@@ -173,113 +231,132 @@ async def get_user_reviews(user_id: str, db: Session = Depends(get_db)):
                 username=user.username
             ))
         
-        return response
+        return page
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch user reviews: {str(e)}")
 
-@router.get("/stats/{movie_id}")
-async def get_movie_rating_stats(movie_id: int, db: Session = Depends(get_db)):
-    """Get rating statistics for a movie"""
+@router.post("/stats/batch")
+async def get_movie_rating_stats_batch(request: StatsBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """Get rating statistics for many movies in a single query"""
+    movie_ids = list(dict.fromkeys(request.movie_ids))
     try:
-        from sqlalchemy import func
-        
-        stats = db.query(
-            func.avg(Review.rating).label('average_rating'),
-            func.count(Review.id).label('total_reviews')
-        ).filter(Review.movie_id == movie_id).first()
+        result = await db.execute(select(MovieStats).where(MovieStats.movie_id.in_(movie_ids)))
+        stats_by_id = {stats.movie_id: stats for stats in result.scalars().all()}
         
         return {
-            "movie_id": movie_id,
-            "average_rating": round(float(stats.average_rating), 1) if stats.average_rating else 0.0,
-            "total_reviews": stats.total_reviews or 0
+            "stats": {str(movie_id): stats_to_dict(stats_by_id.get(movie_id), movie_id) for movie_id in movie_ids}
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch movie stats: {str(e)}")
 
-# Initialize Groq client for recommendations
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-TMDB_API_KEY = os.getenv("TMDB_API_KEY")
-
-groq_client = None
-if GROQ_API_KEY:
-    try:
-        import groq
-        groq_client = groq.Groq(api_key=GROQ_API_KEY)
-    except Exception:
-        groq_client = None
-
-# Alternative Groq API function using direct HTTP requests
-async def groq_api_request(messages, model="llama-3.3-70b-versatile", max_tokens=1000, temperature=0.7):
-    """Make direct HTTP request to Groq API as fallback"""
-    if not GROQ_API_KEY:
-        return None
-    
-    try:
-        import requests
-        
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        data = {
-            "model": model,
-            "messages": messages,
-            "max_tokens": max_tokens,
-            "temperature": temperature
-        }
-        
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        response.raise_for_status()
-        return response.json()
-    except Exception:
-        return None
-
-async def get_movie_metadata_from_tmdb(movie_id: int) -> Optional[dict]:
-    """Get detailed movie metadata including genres and keywords from TMDb API"""
-    if not TMDB_API_KEY:
-        return None
-    
+@router.get("/stats/{movie_id}")
+async def get_movie_rating_stats(movie_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get rating statistics for a movie from its precomputed aggregates"""
     try:
-        # Get movie details
-        details_url = f"https://api.themoviedb.org/3/movie/{movie_id}"
-        details_params = {
-            "api_key": TMDB_API_KEY,
-            "language": "en-US"
-        }
-        
-        details_response = requests.get(details_url, params=details_params, timeout=10)
-        details_response.raise_for_status()
-        movie_details = details_response.json()
-        
-        # Get movie keywords
-        keywords_url = f"https://api.themoviedb.org/3/movie/{movie_id}/keywords"
-        keywords_params = {"api_key": TMDB_API_KEY}
+        stats = await db.get(MovieStats, movie_id)
         
-        keywords_response = requests.get(keywords_url, params=keywords_params, timeout=10)
-        keywords_response.raise_for_status()
-        keywords_data = keywords_response.json()
+        # Title and genres come from the local metadata store only
+        metadata = (await get_stored_metadata(db, [movie_id])).get(movie_id)
         
         return {
-            "id": movie_details["id"],
-            "title": movie_details["title"],
-            "genres": [genre["name"] for genre in movie_details.get("genres", [])],
-            "keywords": [keyword["name"] for keyword in keywords_data.get("keywords", [])[:10]],  # Limit to 10 keywords
-            "overview": movie_details.get("overview", ""),
-            "release_date": movie_details.get("release_date", ""),
-            "vote_average": movie_details.get("vote_average", 0.0),
-            "runtime": movie_details.get("runtime", 0),
-            "director": None,  # We'll get this from credits if needed
-            "production_companies": [company["name"] for company in movie_details.get("production_companies", [])[:3]]
+            **stats_to_dict(stats, movie_id),
+            "title": metadata.title if metadata else None,
+            "genres": metadata.genres if metadata else []
         }
         
-    except Exception:
-        return None
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch movie stats: {str(e)}")
+
+# Recommendation cache, keyed by user ID and validated against a fingerprint
+# of the user's reviews. A TTL of 0 keeps entries until they are invalidated.
+RECOMMENDATION_CACHE_TTL = float(os.getenv("RECOMMENDATION_CACHE_TTL", "86400"))
+recommendation_cache = TTLCache(
+    max_entries=int(os.getenv("RECOMMENDATION_CACHE_MAX_ENTRIES", "5000")),
+    default_ttl=RECOMMENDATION_CACHE_TTL if RECOMMENDATION_CACHE_TTL > 0 else float("inf")
+)
+
+# Fallback results (collaborative filtering standing in for a failed AI call,
+# or static lists) are only kept briefly so the requested engine is retried
+RECOMMENDATION_FALLBACK_CACHE_TTL = float(os.getenv("RECOMMENDATION_FALLBACK_CACHE_TTL", "300"))
+
+# Recommendation engines selectable per request
+RECOMMENDATION_ENGINES = ["llm", "cf"]
+RECOMMENDATION_ENGINE = os.getenv("RECOMMENDATION_ENGINE", "llm")
+
+# Server-sent events must reach the client unbuffered
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def invalidate_recommendations(user_id: str):
+    """Drop a user's cached recommendations for every engine"""
+    for engine in RECOMMENDATION_ENGINES:
+        recommendation_cache.invalidate((user_id, engine))
+
+def cache_recommendations(cache_key, fingerprint: str, response: RecommendationResponse, fallback: bool):
+    """Cache a response; fallback results expire after RECOMMENDATION_FALLBACK_CACHE_TTL"""
+    ttl = RECOMMENDATION_FALLBACK_CACHE_TTL if fallback else None
+    recommendation_cache.set(cache_key, {"fingerprint": fingerprint, "response": response.model_dump()}, ttl=ttl)
+
+def reviews_fingerprint(user_reviews: List[Review]) -> str:
+    """Fingerprint a user's reviews so any added or changed review yields a new value"""
+    digest = hashlib.sha1()
+    for review in sorted(user_reviews, key=lambda r: str(r.id)):
+        digest.update(f"{review.id}:{review.movie_id}:{review.rating}:{review.created_at}".encode())
+    return f"{len(user_reviews)}:{digest.hexdigest()}"
+
+RECOMMENDATION_SYSTEM_PROMPT = "You are a movie recommendation expert. Always respond with valid JSON format only."
+
+RECOMMENDATION_PROMPT = """
+You are a movie recommendation expert. Based on this detailed user profile with genre preferences and movie metadata, recommend exactly 4 movies they would love.
+
+User's detailed movie profile:
+{preferences}
+
+Recommendation Guidelines:
+1. Prioritize movies that match their favorite genres and themes/keywords
+2. Consider their rating patterns and review content sentiment
+3. Avoid movies they've already rated
+4. Include a mix of popular classics and critically acclaimed films
+5. Ensure variety across different sub-genres while staying within their preferences
+6. Consider the specific elements they praised in their reviews
+
+For each recommendation, provide:
+- "title": the exact movie title (must be searchable on TMDb)
+- "reason": a personalized explanation (max 60 words) connecting the recommendation to their specific preferences, mentioning relevant genres/themes
+
+Format as a JSON array with exactly 4 objects:
+[
+  {{"title": "Movie Title", "reason": "Matches your love for [specific genre/theme] seen in your high rating of [example movie]. Features [relevant elements] you praised."}},
+  ...
+]
 
-async def get_user_movie_preferences_enhanced(user_reviews: List[Review]) -> str:
-    """Analyze user's movie preferences with enhanced metadata from TMDb"""
+Focus on quality over quantity - each recommendation should feel personally curated for this user's taste profile.
+Return only the JSON array, no additional text.
+"""
+
+def build_recommendation_messages(preferences: str) -> List[dict]:
+    """Chat messages asking the LLM for 4 recommendations as a JSON array"""
+    return [
+        {"role": "system", "content": RECOMMENDATION_SYSTEM_PROMPT},
+        {"role": "user", "content": RECOMMENDATION_PROMPT.format(preferences=preferences)}
+    ]
+
+def parse_ai_recommendations(ai_response: str) -> list:
+    """Decode the LLM's JSON array, tolerating markdown code fences"""
+    ai_response = ai_response.strip()
+    if ai_response.startswith("```json"):
+        ai_response = ai_response.replace("```json", "").replace("```", "").strip()
+    try:
+        recommendations = json.loads(ai_response)
+    except json.JSONDecodeError:
+        return []
+    return recommendations if isinstance(recommendations, list) else []
+
+async def get_user_movie_preferences_enhanced(user_reviews: List[Review], db: AsyncSession) -> str:
+    """Analyze user's movie preferences with enhanced metadata from the local store"""
     if not user_reviews:
         return "User has no movie reviews yet"
     
@@ -289,22 +366,23 @@ async def get_user_movie_preferences_enhanced(user_reviews: List[Review]) -> str
     
     preference_text = f"User has rated {len(user_reviews)} movies. "
     
+    # Get metadata for the top 5 liked and 2 disliked movies; only missing or
+    # stale entries are fetched from TMDb, concurrently and rate limited
+    liked_reviews = high_rated[:5]
+    disliked_reviews = low_rated[:2]
+    movie_ids = list(dict.fromkeys(review.movie_id for review in liked_reviews + disliked_reviews))
+    metadata_by_id = await get_movie_metadata(db, movie_ids)
+    
     # Enhanced profiling with metadata for top-rated movies
     if high_rated:
         preference_text += f"Highly rated movies (4+ stars): {len(high_rated)} movies. "
         
-        # Get metadata for top 3-5 highest-rated movies to avoid API limits
-        top_movies_to_analyze = min(5, len(high_rated))
         favorite_genres = []
         favorite_keywords = []
         favorite_movies_details = []
         
-        # Add a small delay between API calls to respect rate limits
-        for i, review in enumerate(high_rated[:top_movies_to_analyze]):
-            if i > 0:  # Add delay between requests (except for the first one)
-                await asyncio.sleep(0.25)  # 250ms delay between requests
-                
-            movie_metadata = await get_movie_metadata_from_tmdb(review.movie_id)
+        for review in liked_reviews:
+            movie_metadata = metadata_by_id.get(review.movie_id)
             if movie_metadata:
                 favorite_genres.extend(movie_metadata["genres"])
                 favorite_keywords.extend(movie_metadata["keywords"])
@@ -339,8 +417,8 @@ async def get_user_movie_preferences_enhanced(user_reviews: List[Review]) -> str
     # Add disliked movies for contrast
     if low_rated:
         preference_text += f"Lower-rated movies (2.5 or less): {len(low_rated)} movies. "
-        for review in low_rated[:2]:
-            movie_metadata = await get_movie_metadata_from_tmdb(review.movie_id)
+        for review in disliked_reviews:
+            movie_metadata = metadata_by_id.get(review.movie_id)
             if movie_metadata:
                 preference_text += f"Disliked '{movie_metadata['title']}' (rated {review.rating}/5, genres: {', '.join(movie_metadata['genres'][:2])}): '{review.content[:80]}...' "
             else:
@@ -348,256 +426,224 @@ async def get_user_movie_preferences_enhanced(user_reviews: List[Review]) -> str
     
     return preference_text
 
-async def get_movie_details_from_tmdb(movie_title: str) -> Optional[dict]:
-    """Search for movie details using TMDb API"""
-    if not TMDB_API_KEY:
+def recommendation_card(movie_details: dict, reason: str) -> RecommendedMovie:
+    """Build a recommendation card from resolved movie details"""
+    return RecommendedMovie(
+        movie_id=movie_details["movie_id"],
+        title=movie_details["title"],
+        poster_path=movie_details["poster_path"],
+        overview=movie_details["overview"],
+        release_date=movie_details["release_date"],
+        vote_average=movie_details["vote_average"],
+        reason=reason
+    )
+
+async def resolve_ai_recommendation(rec: dict) -> Optional[RecommendedMovie]:
+    """Resolve an LLM recommendation's title and build its card"""
+    if not isinstance(rec, dict) or not rec.get("title"):
+        return None
+    movie_details = await resolve_title(rec["title"])
+    if not movie_details:
         return None
+    return recommendation_card(movie_details, rec.get("reason", "Recommended based on your preferences"))
+
+async def get_llm_recommendations(preferences: str) -> List[RecommendedMovie]:
+    """Get recommendations from Groq AI, resolved against TMDb"""
+    ai_response = await chat_completion(build_recommendation_messages(preferences), max_tokens=1000, temperature=0.7)
+    if not ai_response:
+        return []
+    
+    ai_recommendations = [
+        rec for rec in parse_ai_recommendations(ai_response)
+        if isinstance(rec, dict) and rec.get("title")
+    ][:4]  # Limit to 4 recommendations
     
+    # Resolve every title at once; repeat titles are served from the title index
+    resolved = await resolve_titles(rec["title"] for rec in ai_recommendations)
+    return [
+        recommendation_card(resolved[rec["title"]], rec.get("reason", "Recommended based on your preferences"))
+        for rec in ai_recommendations if rec["title"] in resolved
+    ]
+
+async def stream_llm_recommendations(preferences: str) -> AsyncIterator[RecommendedMovie]:
+    """Yield recommendation cards from a streamed Groq completion
+
+    Each object in the LLM's JSON array is resolved against TMDb as soon as
+    it has been generated, and its card is yielded as soon as it resolves.
+    Errors from the completion (including its deadline) are raised after
+    the cards already under way have been delivered.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def resolve(rec: dict):
+        try:
+            movie = await resolve_ai_recommendation(rec)
+        except Exception:
+            return
+        if movie:
+            await queue.put(movie)
+    
+    async def produce():
+        parser = JsonObjectStream()
+        resolving = []
+        try:
+            async for text in stream_chat_completion(build_recommendation_messages(preferences), max_tokens=1000, temperature=0.7):
+                for rec in parser.feed(text):
+                    if len(resolving) < 4:  # Limit to 4 recommendations
+                        resolving.append(asyncio.create_task(resolve(rec)))
+        finally:
+            await asyncio.gather(*resolving)
+            await queue.put(None)
+    
+    producer = asyncio.create_task(produce())
     try:
-        # Search for the movie
-        search_url = "https://api.themoviedb.org/3/search/movie"
-        params = {
-            "api_key": TMDB_API_KEY,
-            "query": movie_title,
-            "language": "en-US"
-        }
-        
-        response = requests.get(search_url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get("results") and len(data["results"]) > 0:
-            movie = data["results"][0]  # Take the first (most relevant) result
-            return {
-                "movie_id": movie["id"],
-                "title": movie["title"],
-                "poster_path": movie.get("poster_path"),
-                "overview": movie.get("overview", ""),
-                "release_date": movie.get("release_date", ""),
-                "vote_average": movie.get("vote_average", 0.0)
-            }
-    except Exception:
-        pass
+        while (movie := await queue.get()) is not None:
+            yield movie
+        await producer
+    finally:
+        producer.cancel()
+
+async def get_fallback_recommendations(preferences: str) -> List[RecommendedMovie]:
+    """Popular movies picked by broad genre, for users no engine knows anything about"""
+    import random
+    
+    # Different movie pools based on user preference analysis
+    if "action" in preferences.lower() or "adventure" in preferences.lower():
+        fallback_movies = ["Mad Max: Fury Road", "John Wick", "The Matrix", "Inception"]
+    elif "drama" in preferences.lower() or "emotional" in preferences.lower():
+        fallback_movies = ["The Shawshank Redemption", "Forrest Gump", "Good Will Hunting", "A Beautiful Mind"]
+    elif "comedy" in preferences.lower() or "funny" in preferences.lower():
+        fallback_movies = ["The Grand Budapest Hotel", "Superbad", "Groundhog Day", "The Big Lebowski"]
+    elif "horror" in preferences.lower() or "thriller" in preferences.lower():
+        fallback_movies = ["Get Out", "A Quiet Place", "The Silence of the Lambs", "Hereditary"]
+    elif "sci-fi" in preferences.lower() or "science" in preferences.lower():
+        fallback_movies = ["Blade Runner 2049", "Interstellar", "Ex Machina", "Arrival"]
+    else:
+        # Default varied recommendations
+        all_fallback_options = [
+            ["The Shawshank Redemption", "The Godfather", "Pulp Fiction", "The Dark Knight"],
+            ["Inception", "Interstellar", "The Matrix", "Blade Runner 2049"],
+            ["Forrest Gump", "Good Will Hunting", "A Beautiful Mind", "The Pursuit of Happyness"],
+            ["Mad Max: Fury Road", "John Wick", "The Avengers", "Guardians of the Galaxy"]
+        ]
+        fallback_movies = random.choice(all_fallback_options)
+    
+    resolved = await resolve_titles(fallback_movies)
+    return [
+        recommendation_card(resolved[movie_title], "Popular movie that many users enjoy")
+        for movie_title in fallback_movies if movie_title in resolved
+    ]
+
+async def get_collaborative_recommendations(user_reviews: List[Review], db: AsyncSession) -> List[RecommendedMovie]:
+    """Get recommendations from the local item-item collaborative filtering engine"""
+    user_ratings = {review.movie_id: review.rating for review in user_reviews}
+    
+    # Ask for extra candidates in case some have no metadata available
+    results = recommend_for_user(user_ratings, k=8)
+    if not results:
+        return []
+    
+    movie_ids = list(dict.fromkeys([movie_id for movie_id, _, _ in results] + [because_id for _, _, because_id in results]))
+    metadata_by_id = await get_movie_metadata(db, movie_ids)
     
-    return None
+    recommendations = []
+    for movie_id, score, because_id in results:
+        movie_metadata = metadata_by_id.get(movie_id)
+        if not movie_metadata:
+            continue
+        
+        because = metadata_by_id.get(because_id)
+        if because:
+            reason = f"Users who enjoyed '{because['title']}' as much as you did also rated this highly."
+        else:
+            reason = "Highly rated by users with similar taste to yours."
+        
+        recommendations.append(RecommendedMovie(
+            movie_id=movie_id,
+            title=movie_metadata["title"],
+            poster_path=movie_metadata["poster_path"],
+            overview=movie_metadata["overview"],
+            release_date=movie_metadata["release_date"],
+            vote_average=movie_metadata["vote_average"],
+            reason=reason
+        ))
+        if len(recommendations) == 4:
+            break
+    
+    return recommendations
+
+def resolve_engine(engine: Optional[str]) -> str:
+    """Validate the requested recommendation engine, applying the default"""
+    engine = engine or RECOMMENDATION_ENGINE
+    if engine not in RECOMMENDATION_ENGINES:
+        raise HTTPException(status_code=400, detail=f"Unknown recommendation engine. Use one of: {', '.join(RECOMMENDATION_ENGINES)}")
+    return engine
+
+async def get_reviews_for_recommendations(db: AsyncSession, user_id: str):
+    """Load a user and their reviews, rejecting unknown users and users without reviews"""
+    # Verify user exists
+    user = await db.get(User, uuid.UUID(user_id))
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Get user's reviews
+    result = await db.execute(select(Review).where(Review.user_id == user.id))
+    user_reviews = result.scalars().all()
+    
+    if not user_reviews:
+        raise HTTPException(status_code=400, detail="User has no reviews yet. Please rate some movies first to get recommendations.")
+    return user, user_reviews
+
+async def get_recommendation_preferences(user_reviews: List[Review], engine: str, db: AsyncSession) -> str:
+    """Preference profile for the AI engine (other engines do not use one)"""
+    if engine != "llm":
+        return ""
+    try:
+        return await get_user_movie_preferences_enhanced(user_reviews, db)
+    except Exception:
+        # Fallback to basic preference analysis
+        return f"User has rated {len(user_reviews)} movies. Basic analysis available."
 
 @router.get("/recommendations/{user_id}", response_model=RecommendationResponse)
-async def get_movie_recommendations(user_id: str, db: Session = Depends(get_db)):
-    """Get personalized movie recommendations for a user using Groq AI"""
+async def get_movie_recommendations(user_id: str, engine: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Get personalized movie recommendations for a user
+    
+    `engine` selects "llm" (Groq AI, falling back to collaborative filtering)
+    or "cf" (local collaborative filtering only). Defaults to RECOMMENDATION_ENGINE.
+    """
+    engine = resolve_engine(engine)
+    
     try:
-        # Verify user exists
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        # Get user's reviews
-        user_reviews = db.query(Review).filter(Review.user_id == user_id).all()
+        user, user_reviews = await get_reviews_for_recommendations(db, user_id)
         
-        if not user_reviews:
-            raise HTTPException(status_code=400, detail="User has no reviews yet. Please rate some movies first to get recommendations.")
+        # Serve cached recommendations if the user's reviews haven't changed
+        cache_key = (str(user.id), engine)
+        fingerprint = reviews_fingerprint(user_reviews)
+        cached = recommendation_cache.get(cache_key)
+        if cached and cached["fingerprint"] == fingerprint:
+            return RecommendationResponse(**cached["response"])
         
-        # Analyze user preferences with enhanced metadata
-        try:
-            preferences = await get_user_movie_preferences_enhanced(user_reviews)
-        except Exception:
-            # Fallback to basic preference analysis
-            preferences = f"User has rated {len(user_reviews)} movies. Basic analysis available."
-        
-        # Use Groq AI to generate recommendations
         recommendations = []
+        fallback = False
+        preferences = await get_recommendation_preferences(user_reviews, engine, db)
         
-        # Try Groq client first, then direct API request
-        ai_response = None
-        
-        if groq_client:
-            try:
-                prompt = f"""
-                You are a movie recommendation expert. Based on this detailed user profile with genre preferences and movie metadata, recommend exactly 4 movies they would love.
-                
-                User's detailed movie profile:
-                {preferences}
-                
-                Recommendation Guidelines:
-                1. Prioritize movies that match their favorite genres and themes/keywords
-                2. Consider their rating patterns and review content sentiment
-                3. Avoid movies they've already rated
-                4. Include a mix of popular classics and critically acclaimed films
-                5. Ensure variety across different sub-genres while staying within their preferences
-                6. Consider the specific elements they praised in their reviews
-                
-                For each recommendation, provide:
-                - "title": the exact movie title (must be searchable on TMDb)
-                - "reason": a personalized explanation (max 60 words) connecting the recommendation to their specific preferences, mentioning relevant genres/themes
-                
-                Format as a JSON array with exactly 4 objects:
-                [
-                  {{"title": "Movie Title", "reason": "Matches your love for [specific genre/theme] seen in your high rating of [example movie]. Features [relevant elements] you praised."}},
-                  ...
-                ]
-                
-                Focus on quality over quantity - each recommendation should feel personally curated for this user's taste profile.
-                Return only the JSON array, no additional text.
-                """
-                
-                chat_completion = groq_client.chat.completions.create(
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a movie recommendation expert. Always respond with valid JSON format only."
-                        },
-                        {
-                            "role": "user", 
-                            "content": prompt
-                        }
-                    ],
-                    model="llama-3.3-70b-versatile",
-                    temperature=0.7,
-                    max_tokens=1000
-                )
-                
-                # Parse the AI response
-                ai_response = chat_completion.choices[0].message.content.strip()
-                
-                # Clean up the response to ensure it's valid JSON
-                if ai_response.startswith("```json"):
-                    ai_response = ai_response.replace("```json", "").replace("```", "").strip()
-                
-                import json
-                try:
-                    ai_recommendations = json.loads(ai_response)
-                except json.JSONDecodeError:
-                    ai_recommendations = []
-                
-                # Get movie details from TMDb for each recommendation
-                for i, rec in enumerate(ai_recommendations[:4]):  # Limit to 4 recommendations
-                    try:
-                        movie_details = await get_movie_details_from_tmdb(rec["title"])
-                        if movie_details:
-                            recommendations.append(RecommendedMovie(
-                                movie_id=movie_details["movie_id"],
-                                title=movie_details["title"],
-                                poster_path=movie_details["poster_path"],
-                                overview=movie_details["overview"],
-                                release_date=movie_details["release_date"],
-                                vote_average=movie_details["vote_average"],
-                                reason=rec.get("reason", "Recommended based on your preferences")
-                            ))
-                    except Exception:
-                        continue
-
-            except Exception:
-                pass
-        else:
-            # Try direct API request as fallback
+        # Use Groq AI to generate recommendations
+        if engine == "llm":
             try:
-                messages = [
-                    {
-                        "role": "system",
-                        "content": "You are a movie recommendation expert. Always respond with valid JSON format only."
-                    },
-                    {
-                        "role": "user", 
-                        "content": f"""
-                        You are a movie recommendation expert. Based on this detailed user profile with genre preferences and movie metadata, recommend exactly 4 movies they would love.
-                        
-                        User's detailed movie profile:
-                        {preferences}
-                        
-                        Recommendation Guidelines:
-                        1. Prioritize movies that match their favorite genres and themes/keywords
-                        2. Consider their rating patterns and review content sentiment
-                        3. Avoid movies they've already rated
-                        4. Include a mix of popular classics and critically acclaimed films
-                        5. Ensure variety across different sub-genres while staying within their preferences
-                        6. Consider the specific elements they praised in their reviews
-                        
-                        For each recommendation, provide:
-                        - "title": the exact movie title (must be searchable on TMDb)
-                        - "reason": a personalized explanation (max 60 words) connecting the recommendation to their specific preferences, mentioning relevant genres/themes
-                        
-                        Format as a JSON array with exactly 4 objects:
-                        [
-                          {{"title": "Movie Title", "reason": "Matches your love for [specific genre/theme] seen in your high rating of [example movie]. Features [relevant elements] you praised."}},
-                          ...
-                        ]
-                        
-                        Focus on quality over quantity - each recommendation should feel personally curated for this user's taste profile.
-                        Return only the JSON array, no additional text.
-                        """
-                    }
-                ]
-                
-                direct_api_result = await groq_api_request(messages, max_tokens=1000, temperature=0.7)
-                if direct_api_result and 'choices' in direct_api_result:
-                    ai_response = direct_api_result['choices'][0]['message']['content'].strip()
-                    
-                    # Clean up the response to ensure it's valid JSON
-                    if ai_response.startswith("```json"):
-                        ai_response = ai_response.replace("```json", "").replace("```", "").strip()
-                    
-                    # Process the AI response (same logic as client method)
-                    import json
-                    try:
-                        ai_recommendations = json.loads(ai_response)
-                        
-                        for i, rec in enumerate(ai_recommendations[:4]):
-                            try:
-                                movie_details = await get_movie_details_from_tmdb(rec["title"])
-                                if movie_details:
-                                    recommendations.append(RecommendedMovie(
-                                        movie_id=movie_details["movie_id"],
-                                        title=movie_details["title"],
-                                        poster_path=movie_details["poster_path"],
-                                        overview=movie_details["overview"],
-                                        release_date=movie_details["release_date"],
-                                        vote_average=movie_details["vote_average"],
-                                        reason=rec.get("reason", "Recommended based on your preferences")
-                                    ))
-                            except Exception:
-                                continue
-                    except json.JSONDecodeError:
-                        pass
+                recommendations = await get_llm_recommendations(preferences)
             except Exception:
-                pass
+                recommendations = []
         
-        # Fallback recommendations if AI failed or no Groq client
+        # Collaborative filtering is the primary engine for "cf" and the
+        # fast fallback when the AI path produced nothing
         if not recommendations:
-            # Create varied fallback recommendations based on user's ratings
-            import random
-            
-            # Different movie pools based on user preference analysis
-            if "action" in preferences.lower() or "adventure" in preferences.lower():
-                fallback_movies = ["Mad Max: Fury Road", "John Wick", "The Matrix", "Inception"]
-            elif "drama" in preferences.lower() or "emotional" in preferences.lower():
-                fallback_movies = ["The Shawshank Redemption", "Forrest Gump", "Good Will Hunting", "A Beautiful Mind"]
-            elif "comedy" in preferences.lower() or "funny" in preferences.lower():
-                fallback_movies = ["The Grand Budapest Hotel", "Superbad", "Groundhog Day", "The Big Lebowski"]
-            elif "horror" in preferences.lower() or "thriller" in preferences.lower():
-                fallback_movies = ["Get Out", "A Quiet Place", "The Silence of the Lambs", "Hereditary"]
-            elif "sci-fi" in preferences.lower() or "science" in preferences.lower():
-                fallback_movies = ["Blade Runner 2049", "Interstellar", "Ex Machina", "Arrival"]
-            else:
-                # Default varied recommendations
-                all_fallback_options = [
-                    ["The Shawshank Redemption", "The Godfather", "Pulp Fiction", "The Dark Knight"],
-                    ["Inception", "Interstellar", "The Matrix", "Blade Runner 2049"],
-                    ["Forrest Gump", "Good Will Hunting", "A Beautiful Mind", "The Pursuit of Happyness"],
-                    ["Mad Max: Fury Road", "John Wick", "The Avengers", "Guardians of the Galaxy"]
-                ]
-                fallback_movies = random.choice(all_fallback_options)
-            
-            for movie_title in fallback_movies:
-                movie_details = await get_movie_details_from_tmdb(movie_title)
-                if movie_details:
-                    recommendations.append(RecommendedMovie(
-                        movie_id=movie_details["movie_id"],
-                        title=movie_details["title"],
-                        poster_path=movie_details["poster_path"],
-                        overview=movie_details["overview"],
-                        release_date=movie_details["release_date"],
-                        vote_average=movie_details["vote_average"],
-                        reason="Popular movie that many users enjoy"
-                    ))
+            fallback = engine != "cf"
+            recommendations = await get_collaborative_recommendations(user_reviews, db)
+        
+        # Static lists only cover users the engine knows nothing about yet
+        if not recommendations:
+            fallback = True
+            recommendations = await get_fallback_recommendations(preferences)
         
         if not recommendations:
             return RecommendationResponse(
@@ -605,12 +651,88 @@ async def get_movie_recommendations(user_id: str, db: Session = Depends(get_db))
                 recommendations=[]
             )
         
-        return RecommendationResponse(
+        response = RecommendationResponse(
             user_id=user_id,
             recommendations=recommendations[:4]  # Ensure max 4 recommendations
         )
+        cache_recommendations(cache_key, fingerprint, response, fallback)
+        
+        return response
         
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate recommendations: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to generate recommendations: {str(e)}")
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def recommendation_events(user_id: str, user_reviews: List[Review], preferences: str, engine: str, cache_key, fingerprint: str) -> AsyncIterator[str]:
+    """Server-sent events for the streaming recommendations endpoint"""
+    recommendations = []
+    complete = True
+    fallback = False
+    
+    if engine == "llm":
+        try:
+            async for movie in stream_llm_recommendations(preferences):
+                recommendations.append(movie)
+                yield sse_event("recommendation", movie.model_dump())
+        except Exception:
+            # Keep the cards already sent, but don't cache a cut-short list
+            complete = False
+    
+    # Same fallbacks as the non-streaming endpoint; the request's session may
+    # already be closed while the response streams, so use a fresh one
+    if not recommendations:
+        fallback = engine != "cf"
+        async with AsyncSessionLocal() as db:
+            recommendations = await get_collaborative_recommendations(user_reviews, db)
+        if not recommendations:
+            fallback = True
+            recommendations = await get_fallback_recommendations(preferences)
+        recommendations = recommendations[:4]
+        for movie in recommendations:
+            yield sse_event("recommendation", movie.model_dump())
+    
+    if recommendations and complete:
+        response = RecommendationResponse(user_id=user_id, recommendations=recommendations)
+        cache_recommendations(cache_key, fingerprint, response, fallback)
+    
+    yield sse_event("done", {"user_id": user_id, "count": len(recommendations)})
+
+@router.get("/recommendations/{user_id}/stream")
+async def stream_movie_recommendations(user_id: str, engine: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Stream personalized movie recommendations as server-sent events
+    
+    Sends a `recommendation` event with each movie card as soon as it is
+    ready, then a `done` event. Errors about the user are returned as normal
+    JSON responses before the stream starts.
+    """
+    engine = resolve_engine(engine)
+    
+    try:
+        user, user_reviews = await get_reviews_for_recommendations(db, user_id)
+        
+        cache_key = (str(user.id), engine)
+        fingerprint = reviews_fingerprint(user_reviews)
+        cached = recommendation_cache.get(cache_key)
+        if cached and cached["fingerprint"] == fingerprint:
+            recommendations = cached["response"]["recommendations"]
+            events = [sse_event("recommendation", movie) for movie in recommendations]
+            events.append(sse_event("done", {"user_id": user_id, "count": len(recommendations)}))
+            return StreamingResponse(iter(events), media_type="text/event-stream", headers=SSE_HEADERS)
+        
+        preferences = await get_recommendation_preferences(user_reviews, engine, db)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate recommendations: {str(e)}")
+    
+    return StreamingResponse(
+        recommendation_events(user_id, user_reviews, preferences, engine, cache_key, fingerprint),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
@@ -0,0 +1,88 @@
+import re
+from typing import Iterable, Tuple
+
+POSITIVE_WORDS = frozenset([
+    'good', 'great', 'excellent', 'amazing', 'love', 'loved', 'loves', 'best', 'awesome',
+    'fantastic', 'wonderful', 'brilliant', 'outstanding', 'superb',
+    'incredible', 'perfect', 'beautiful', 'stunning', 'masterpiece',
+    'enjoyable', 'entertaining', 'impressive', 'remarkable', 'exceptional'
+])
+
+NEGATIVE_WORDS = frozenset([
+    'bad', 'terrible', 'awful', 'hate', 'hated', 'hates', 'worst', 'horrible',
+    'disappointing', 'boring', 'poor', 'waste', 'pathetic', 'garbage',
+    'stupid', 'ridiculous', 'annoying', 'frustrating', 'dreadful',
+    'mediocre', 'overrated', 'bland', 'tedious', 'unwatchable'
+])
+
+TOKEN_PATTERN = re.compile(r"[a-z]+")
+
+
+class SentimentAnalyzer:
+    """Keyword-based sentiment scorer
+
+    The lexicon is compiled once into a word -> polarity map, so scoring a
+    text is a single tokenizing pass with one dict lookup per word, no matter
+    how large the lexicon grows.
+    """
+
+    def __init__(self, positive_words: Iterable[str] = POSITIVE_WORDS, negative_words: Iterable[str] = NEGATIVE_WORDS):
+        self.polarity = {word: 1 for word in positive_words}
+        self.polarity.update((word, -1) for word in negative_words)
+
+    def analyze(self, text: str) -> Tuple[str, float]:
+        """Sentiment label and confidence for a text
+
+        Each distinct keyword counts once, however often it appears.
+        """
+        positive, negative = set(), set()
+        total_words = 0
+        for word in TOKEN_PATTERN.findall(text.lower()):
+            total_words += 1
+            polarity = self.polarity.get(word)
+            if polarity == 1:
+                positive.add(word)
+            elif polarity == -1:
+                negative.add(word)
+
+        if len(positive) > len(negative):
+            sentiment = 'positive'
+        elif len(negative) > len(positive):
+            sentiment = 'negative'
+        else:
+            sentiment = 'neutral'
+
+        return sentiment, sentiment_confidence(sentiment, len(positive), len(negative), total_words)
+
+
+def sentiment_confidence(sentiment: str, positive_matches: int, negative_matches: int, total_words: int) -> float:
+    """Calculate confidence score based on keyword density and text length"""
+    # Base confidence
+    if sentiment == 'neutral':
+        base_confidence = 0.5
+    else:
+        # Higher confidence for more keyword matches
+        relevant_matches = positive_matches if sentiment == 'positive' else negative_matches
+        base_confidence = min(0.9, 0.6 + (relevant_matches * 0.1))
+
+    # Adjust confidence based on text length
+    if total_words < 5:
+        base_confidence *= 0.8  # Lower confidence for very short text
+    elif total_words > 50:
+        base_confidence *= 1.1  # Higher confidence for longer text
+
+    # Ensure confidence is between 0.3 and 0.9
+    return max(0.3, min(0.9, base_confidence))
+
+
+analyzer = SentimentAnalyzer()
+
+
+def analyze_text(text: str) -> Tuple[str, float]:
+    """Sentiment label and confidence using the default lexicon"""
+    return analyzer.analyze(text)
+
+
+def simple_sentiment_analysis(text: str) -> str:
+    """Sentiment label using the default lexicon"""
+    return analyzer.analyze(text)[0]
@@ -0,0 +1,109 @@
+"""Backfill sentiment for reviews stored without one
+
+Streams reviews whose sentiment is NULL through a server-side cursor, scores
+them in chunks and writes each chunk back with a single bulk UPDATE ... FROM
+that also adds the new labels to movie_stats. Every chunk commits on its own,
+so an interrupted run simply resumes with the rows still left NULL:
+
+    python sentiment_backfill.py
+    python sentiment_backfill.py --chunk-size 5000
+"""
+import argparse
+import os
+import time
+from typing import List, Tuple
+from sqlalchemy import String, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from database import engine
+from models.movie_stats import MovieStats
+from models.review import Review
+from sentiment_analyzer import simple_sentiment_analysis
+from stats_store import SENTIMENT_COLUMNS
+
+SENTIMENT_BACKFILL_CHUNK = int(os.getenv("SENTIMENT_BACKFILL_CHUNK", "2000"))
+
+
+def build_chunk_update():
+    """Statement storing scored reviews and adding their labels to movie_stats
+
+    The chunk is bound as two parallel arrays and unnested into a
+    (id, sentiment) row set, so the statement compiles once and is cached
+    no matter how many rows each chunk carries. Rows that gained a sentiment
+    since they were read are left alone. Selects the number of reviews updated.
+    """
+    scored = func.unnest(
+        bindparam("ids", type_=ARRAY(UUID(as_uuid=True))),
+        bindparam("sentiments", type_=ARRAY(String))
+    ).table_valued("id", "sentiment").render_derived(name="scored")
+
+    updated = (
+        update(Review)
+        .where(Review.id == scored.c.id, Review.sentiment.is_(None))
+        .values(sentiment=scored.c.sentiment)
+        .returning(Review.movie_id, Review.sentiment)
+        .cte("updated")
+    )
+    counts = (
+        select(
+            updated.c.movie_id,
+            *[func.count().filter(updated.c.sentiment == sentiment).label(counter)
+              for sentiment, counter in SENTIMENT_COLUMNS.items()]
+        )
+        .group_by(updated.c.movie_id)
+        .subquery("counts")
+    )
+    stats_update = (
+        update(MovieStats)
+        .where(MovieStats.movie_id == counts.c.movie_id)
+        .values({counter: getattr(MovieStats, counter) + counts.c[counter] for counter in SENTIMENT_COLUMNS.values()})
+        .cte("stats_update")
+    )
+
+    return select(func.count()).select_from(updated).add_cte(stats_update)
+
+
+chunk_update = build_chunk_update()
+
+
+def write_chunk(connection, scored: List[Tuple[object, str]]) -> int:
+    """Store (review_id, sentiment) pairs in one statement; returns the number updated"""
+    return connection.execute(chunk_update, {
+        "ids": [review_id for review_id, _ in scored],
+        "sentiments": [sentiment for _, sentiment in scored],
+    }).scalar_one()
+
+
+def backfill_sentiment(chunk_size: int = SENTIMENT_BACKFILL_CHUNK) -> int:
+    """Score every review with a NULL sentiment, printing progress per chunk
+
+    Returns the number of reviews updated.
+    """
+    pending = select(Review.id, Review.content).where(Review.sentiment.is_(None))
+
+    with engine.connect() as reader:
+        total = reader.execute(select(func.count()).select_from(pending.subquery())).scalar_one()
+        print(f"{total} reviews without sentiment")
+        if not total:
+            return 0
+
+        result = reader.execution_options(stream_results=True, yield_per=chunk_size).execute(pending)
+        start = time.perf_counter()
+        written = 0
+        for chunk in result.partitions():
+            scored = [(review_id, simple_sentiment_analysis(content)) for review_id, content in chunk]
+            with engine.begin() as writer:
+                written += write_chunk(writer, scored)
+
+            elapsed = time.perf_counter() - start
+            print(f"{written}/{total} reviews updated ({written / elapsed:.0f}/s)")
+
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill in sentiment for reviews stored without one")
+    parser.add_argument("--chunk-size", type=int, default=SENTIMENT_BACKFILL_CHUNK, help="Reviews scored and written per statement")
+    args = parser.parse_args()
+
+    written = backfill_sentiment(args.chunk_size)
+    print(f"Backfilled sentiment for {written} reviews")
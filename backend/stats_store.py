@@ -0,0 +1,132 @@
+"""Incrementally maintained per-movie rating aggregates
+
+Run as a script to rebuild the movie_stats table from the reviews table:
+
+    python stats_store.py              # rebuild every movie
+    python stats_store.py --movie-id 27205
+"""
+import argparse
+from typing import Optional
+from sqlalchemy import case, delete, func, insert, literal, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from database import SessionLocal
+from models.movie_stats import MovieStats
+from models.review import Review
+
+SENTIMENT_COLUMNS = {
+    "positive": "positive_count",
+    "negative": "negative_count",
+    "neutral": "neutral_count",
+}
+
+STATS_COLUMNS = [
+    "movie_id", "rating_sum", "review_count",
+    "stars_1", "stars_2", "stars_3", "stars_4", "stars_5",
+    *SENTIMENT_COLUMNS.values(),
+    "updated_at",
+]
+
+
+def movie_stats_upsert(reviews):
+    """INSERT ... ON CONFLICT statement adding reviews to their movies' aggregates
+
+    `reviews` is a select (or CTE) yielding movie_id, rating and sentiment
+    columns, at most one row per movie. The statement runs in the caller's
+    transaction, typically as a CTE of the review insert itself.
+    """
+    bucket = func.least(5, func.greatest(1, func.floor(reviews.c.rating)))
+    source = select(
+        reviews.c.movie_id,
+        reviews.c.rating,
+        literal(1),
+        *[case((bucket == star, 1), else_=0) for star in range(1, 6)],
+        *[case((reviews.c.sentiment == sentiment, 1), else_=0) for sentiment in SENTIMENT_COLUMNS],
+    )
+
+    stmt = pg_insert(MovieStats).from_select(STATS_COLUMNS[:-1], source)
+    return stmt.on_conflict_do_update(
+        index_elements=[MovieStats.movie_id],
+        set_={
+            **{column: getattr(MovieStats, column) + getattr(stmt.excluded, column) for column in STATS_COLUMNS[1:-1]},
+            "updated_at": func.now(),
+        }
+    )
+
+
+def stats_to_dict(stats: Optional[MovieStats], movie_id: int) -> dict:
+    """Rating statistics response fields for a movie_stats row (or no row)"""
+    if stats is None:
+        return {
+            "movie_id": movie_id,
+            "average_rating": 0.0,
+            "total_reviews": 0,
+            "rating_distribution": {str(star): 0 for star in range(1, 6)},
+            "sentiment_counts": {sentiment: 0 for sentiment in SENTIMENT_COLUMNS},
+        }
+    return {
+        "movie_id": movie_id,
+        "average_rating": round(stats.average_rating, 1),
+        "total_reviews": stats.review_count,
+        "rating_distribution": {str(star): getattr(stats, f"stars_{star}") for star in range(1, 6)},
+        "sentiment_counts": {sentiment: getattr(stats, column) for sentiment, column in SENTIMENT_COLUMNS.items()},
+    }
+
+
+def rebuild_movie_stats(movie_id: Optional[int] = None) -> int:
+    """Recompute aggregates from the reviews table, for one movie or all of them
+
+    Returns the number of movie_stats rows written.
+    """
+    bucket = func.least(5, func.greatest(1, func.floor(Review.rating)))
+    aggregates = select(
+        Review.movie_id,
+        func.sum(Review.rating),
+        func.count(Review.id),
+        *[func.count(Review.id).filter(bucket == star) for star in range(1, 6)],
+        *[func.count(Review.id).filter(Review.sentiment == sentiment) for sentiment in SENTIMENT_COLUMNS],
+        literal_column("now()"),
+    ).group_by(Review.movie_id)
+
+    clear = delete(MovieStats)
+    if movie_id is not None:
+        aggregates = aggregates.where(Review.movie_id == movie_id)
+        clear = clear.where(MovieStats.movie_id == movie_id)
+
+    db = SessionLocal()
+    try:
+        # Block concurrent incremental upserts until the rebuilt rows are committed
+        db.execute(text("LOCK TABLE movie_stats IN SHARE ROW EXCLUSIVE MODE"))
+        db.execute(clear)
+        result = db.execute(insert(MovieStats).from_select(STATS_COLUMNS, aggregates))
+        db.commit()
+        return result.rowcount
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def backfill_movie_stats_if_empty():
+    """Build movie_stats on first start against a database that already has reviews"""
+    db = SessionLocal()
+    try:
+        has_stats = db.execute(select(MovieStats.movie_id).limit(1)).first() is not None
+        has_reviews = db.execute(select(Review.id).limit(1)).first() is not None
+    finally:
+        db.close()
+    if has_reviews and not has_stats:
+        rebuild_movie_stats()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the movie_stats table from reviews")
+    parser.add_argument("--movie-id", type=int, help="Only rebuild this TMDB movie ID")
+    args = parser.parse_args()
+
+    from database import create_tables
+    import models  # registers every table with Base
+    create_tables()
+
+    written = rebuild_movie_stats(args.movie_id)
+    print(f"Rebuilt stats for {written} movies")
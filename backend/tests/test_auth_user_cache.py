@@ -0,0 +1,65 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select, update
+from database import AsyncSessionLocal
+from models.user import User
+from routers.auth import user_cache
+import main
+
+
+@pytest.fixture
+def client(empty_database):
+    user_cache.clear()
+    with TestClient(main.app) as client:
+        yield client
+
+
+def log_in(client, email="cache@example.com", username="cacheuser"):
+    client.post("/auth/register", json={"username": username, "email": email, "password": "secret1"})
+    token = client.post("/auth/login", json={"email": email, "password": "secret1"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+# Database calls go through the client's event loop, which owns the pooled
+# async connections
+async def change_user(email, values):
+    async with AsyncSessionLocal() as db:
+        user = (await db.execute(select(User).where(User.email == email))).scalar_one()
+        for name, value in values.items():
+            setattr(user, name, value)
+        await db.commit()
+
+
+async def run(statement):
+    async with AsyncSessionLocal() as db:
+        await db.execute(statement)
+        await db.commit()
+
+
+def test_updated_user_is_evicted(client):
+    headers = log_in(client)
+    assert "cache@example.com" in user_cache
+
+    client.portal.call(change_user, "cache@example.com", {"username": "renamed"})
+
+    assert "cache@example.com" not in user_cache
+    assert client.get("/auth/me", headers=headers).json()["username"] == "renamed"
+
+
+def test_email_change_evicts_the_previous_email(client):
+    log_in(client)
+    client.portal.call(change_user, "cache@example.com", {"email": "new@example.com"})
+    assert "cache@example.com" not in user_cache
+
+
+def test_bulk_update_and_delete_clear_the_cache(client):
+    headers = log_in(client)
+    log_in(client, email="other@example.com", username="otheruser")
+
+    client.portal.call(run, update(User).where(User.email == "other@example.com").values(username="bulk"))
+    assert len(user_cache) == 0
+
+    client.get("/auth/me", headers=headers)
+    client.portal.call(run, delete(User).where(User.email == "cache@example.com"))
+    assert len(user_cache) == 0
+    assert client.get("/auth/me", headers=headers).status_code == 401
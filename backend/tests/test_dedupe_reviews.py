@@ -0,0 +1,44 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, inspect, insert, select
+from models.movie_stats import MovieStats
+from models.review import Review
+from models.user import User
+import dedupe_reviews
+
+
+def create_pre_index_schema(engine):
+    """users and reviews as an older deployment has them: no unique index, no movie_stats"""
+    User.__table__.create(bind=engine)
+    Review.__table__.create(bind=engine)
+    dedupe_reviews.UNIQUE_INDEX.drop(bind=engine)
+
+
+def test_dedupe_on_a_database_without_movie_stats(empty_database):
+    engine = empty_database
+    create_pre_index_schema(engine)
+
+    user_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    with engine.begin() as connection:
+        connection.execute(insert(User).values(id=user_id, username="dup", email="dup@example.com", password="x"))
+        connection.execute(insert(Review), [
+            {"id": uuid.uuid4(), "user_id": user_id, "movie_id": 1, "content": "older duplicate", "rating": 1.0, "created_at": now - timedelta(days=1)},
+            {"id": uuid.uuid4(), "user_id": user_id, "movie_id": 1, "content": "newest review", "rating": 5.0, "created_at": now},
+            {"id": uuid.uuid4(), "user_id": user_id, "movie_id": 2, "content": "only review", "rating": 3.0, "created_at": now},
+        ])
+
+    assert dedupe_reviews.dedupe_reviews(dry_run=True) == 1
+    assert dedupe_reviews.dedupe_reviews() == 1
+
+    with engine.connect() as connection:
+        contents = set(connection.execute(select(Review.content)).scalars())
+        stats = {row.movie_id: row for row in connection.execute(select(MovieStats))}
+    assert contents == {"newest review", "only review"}
+    assert stats[1].review_count == 1 and stats[1].rating_sum == 5.0
+    assert stats[2].review_count == 1
+    index_names = {index["name"] for index in inspect(engine).get_indexes("reviews")}
+    assert "uq_reviews_user_id_movie_id" in index_names
+
+    # A second run finds nothing to do
+    assert dedupe_reviews.dedupe_reviews() == 0
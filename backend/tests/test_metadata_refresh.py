@@ -0,0 +1,49 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, select
+from database import AsyncSessionLocal, create_tables
+from models.movie_metadata import MovieMetadata
+import metadata_store
+
+REMOVED_MOVIE = 1
+
+
+async def fake_fetch(movie_id):
+    if movie_id == REMOVED_MOVIE:
+        return None
+    return {
+        "id": movie_id, "title": f"Refreshed {movie_id}", "genres": [], "keywords": [], "overview": "",
+        "poster_path": None, "release_date": "", "vote_average": 0.0, "runtime": 0, "director": None,
+        "production_companies": []
+    }
+
+
+def test_failing_movie_does_not_block_other_refreshes(empty_database, monkeypatch):
+    create_tables()
+    monkeypatch.setattr(metadata_store, "fetch_movie_metadata_from_tmdb", fake_fetch)
+    monkeypatch.setattr(metadata_store, "METADATA_REFRESH_BATCH", 1)
+
+    stale = datetime.now(timezone.utc) - metadata_store.METADATA_MAX_AGE - timedelta(days=1)
+    with empty_database.begin() as connection:
+        connection.execute(insert(MovieMetadata), [
+            # The permanently failing movie is the oldest, so it heads the first batch
+            {"movie_id": REMOVED_MOVIE, "title": "Removed", "fetched_at": stale - timedelta(days=1)},
+            {"movie_id": 2, "title": "Old title", "fetched_at": stale},
+        ])
+
+    async def refresh_twice():
+        async with AsyncSessionLocal() as db:
+            first = await metadata_store.refresh_stale_metadata(db)
+            second = await metadata_store.refresh_stale_metadata(db)
+            rows = {row.movie_id: row for row in (await db.execute(select(MovieMetadata))).scalars()}
+        return first, second, rows
+
+    first, second, rows = asyncio.run(refresh_twice())
+
+    assert (first, second) == (0, 1)
+    assert rows[2].title == "Refreshed 2"
+    # The failed row is kept and only becomes due again after the retry delay
+    assert rows[REMOVED_MOVIE].title == "Removed"
+    due_again = rows[REMOVED_MOVIE].fetched_at + metadata_store.METADATA_MAX_AGE
+    retry_after = metadata_store.METADATA_REFRESH_RETRY_AFTER
+    assert abs(due_again - datetime.now(timezone.utc) - retry_after) < timedelta(minutes=1)
@@ -0,0 +1,23 @@
+import asyncio
+from fastapi import HTTPException
+import routers.movies as movies
+
+
+async def fake_details(movie_id):
+    if movie_id == 404:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    if movie_id == 500:
+        raise HTTPException(status_code=500, detail="Failed to fetch movie details: 429 Too Many Requests")
+    return {"id": movie_id, "title": f"Movie {movie_id}"}
+
+
+def test_upstream_failures_are_not_reported_as_missing(monkeypatch):
+    monkeypatch.setattr(movies, "TMDB_API_KEY", "test-key")
+    monkeypatch.setattr(movies, "fetch_movie_details", fake_details)
+    movies.movie_cache.clear()
+
+    response = asyncio.run(movies.get_movies_batch("1,404,500"))
+
+    assert list(response["movies"]) == ["1"]
+    assert response["not_found"] == [404]
+    assert response["failed"] == [500]
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import os
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from cache import TTLCache
+from database import AsyncSessionLocal
+from models.movie_title import MovieTitle
+from tmdb_client import TMDB_API_KEY, tmdb_get
+
+logger = logging.getLogger(__name__)
+
+# Stored resolutions older than this are searched again, so the card fields
+# (poster, rating, ...) don't drift too far from TMDb
+TITLE_INDEX_MAX_AGE = timedelta(hours=float(os.getenv("TITLE_INDEX_MAX_AGE_HOURS", "168")))
+
+# In-memory front cache over the movie_titles table
+title_cache = TTLCache(
+    max_entries=int(os.getenv("TITLE_CACHE_MAX_ENTRIES", "10000")),
+    default_ttl=float(os.getenv("TITLE_CACHE_TTL", "3600"))
+)
+
+# Combining marks after characters below this code point (Basic Latin to
+# Latin Extended-B) are accents and are dropped; marks in other scripts,
+# such as Devanagari vowel signs or kana voicing marks, are part of the letter
+LATIN_END = "\u0250"
+
+
+def normalize_title(title: str) -> str:
+    """Case-, accent- and punctuation-insensitive key for a movie title
+
+    Letters and digits of every script are kept, so non-Latin titles get a
+    key too; only punctuation, symbols and whitespace separate words.
+    """
+    chars = []
+    for char in unicodedata.normalize("NFKD", title.casefold()):
+        if unicodedata.category(char).startswith("M"):
+            if chars and chars[-1] < LATIN_END:
+                continue
+            chars.append(char)
+        elif char.isalnum():
+            chars.append(char)
+        else:
+            chars.append(" ")
+    return " ".join(unicodedata.normalize("NFC", "".join(chars)).split())
+
+
+def title_to_dict(row: MovieTitle) -> dict:
+    """Convert a stored row to the movie details dict used for recommendation cards"""
+    return {
+        "movie_id": row.movie_id,
+        "title": row.title,
+        "poster_path": row.poster_path,
+        "overview": row.overview or "",
+        "release_date": row.release_date or "",
+        "vote_average": row.vote_average or 0.0
+    }
+
+
+def is_stale(row: MovieTitle) -> bool:
+    """Check a row against the staleness policy"""
+    resolved_at = row.resolved_at
+    if resolved_at is None:
+        return True
+    if resolved_at.tzinfo is None:
+        resolved_at = resolved_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - resolved_at > TITLE_INDEX_MAX_AGE
+
+
+async def search_movie_by_title(movie_title: str) -> Optional[dict]:
+    """Search for movie details using TMDb API"""
+    if not TMDB_API_KEY:
+        return None
+
+    try:
+        # Search for the movie
+        params = {
+            "query": movie_title,
+            "language": "en-US"
+        }
+
+        data = await tmdb_get("/search/movie", params)
+
+        if data.get("results") and len(data["results"]) > 0:
+            movie = data["results"][0]  # Take the first (most relevant) result
+            return {
+                "movie_id": movie["id"],
+                "title": movie["title"],
+                "poster_path": movie.get("poster_path"),
+                "overview": movie.get("overview", ""),
+                "release_date": movie.get("release_date", ""),
+                "vote_average": movie.get("vote_average", 0.0)
+            }
+    except Exception:
+        pass
+
+    return None
+
+
+async def save_titles(resolved: Dict[str, dict]):
+    """Insert or update stored resolutions by normalized title"""
+    rows = [{"normalized_title": key, **details} for key, details in resolved.items()]
+    stmt = pg_insert(MovieTitle).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MovieTitle.normalized_title],
+        set_={
+            **{column: stmt.excluded[column] for column in ("movie_id", "title", "poster_path", "overview", "release_date", "vote_average")},
+            "resolved_at": datetime.now(timezone.utc)
+        }
+    )
+    async with AsyncSessionLocal() as db:
+        await db.execute(stmt)
+        await db.commit()
+
+
+async def resolve_titles(titles: Iterable[str]) -> Dict[str, dict]:
+    """Resolve movie titles to TMDb details, keyed by the titles as given
+
+    Titles are looked up in the in-memory cache, then in the movie_titles
+    table, and only the remaining ones are searched on TMDb, concurrently.
+    Titles TMDb has no match for are left out of the result.
+    """
+    # Titles made only of punctuation or symbols are keyed as given
+    keys = {title: normalize_title(title) or title.strip() for title in titles}
+    keys = {title: key for title, key in keys.items() if key}
+
+    by_key: Dict[str, dict] = {}
+    for key in set(keys.values()):
+        cached = title_cache.get(key)
+        if cached is not None:
+            by_key[key] = cached
+
+    missing = [key for key in set(keys.values()) if key not in by_key]
+    if missing:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(MovieTitle).where(MovieTitle.normalized_title.in_(missing)))
+            for row in result.scalars().all():
+                if not is_stale(row):
+                    by_key[row.normalized_title] = title_to_dict(row)
+                    title_cache.set(row.normalized_title, by_key[row.normalized_title])
+
+    # Search TMDb for what's left, one search per distinct normalized title
+    to_search: Dict[str, str] = {}
+    for title, key in keys.items():
+        if key not in by_key and key not in to_search:
+            to_search[key] = title
+    if to_search:
+        searched = await asyncio.gather(*(search_movie_by_title(title) for title in to_search.values()))
+        resolved = {key: details for key, details in zip(to_search, searched) if details}
+        for key, details in resolved.items():
+            by_key[key] = details
+            title_cache.set(key, details)
+        if resolved:
+            try:
+                await save_titles(resolved)
+            except Exception:
+                logger.exception("Failed to store movie title resolutions")
+
+    return {title: by_key[key] for title, key in keys.items() if key in by_key}
+
+
+async def resolve_title(title: str) -> Optional[dict]:
+    """Resolve a single movie title; see resolve_titles"""
+    return (await resolve_titles([title])).get(title)
@@ -0,0 +1,152 @@
+import asyncio
+import functools
+import httpx
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Optional, Tuple
+from dotenv import load_dotenv
+from metrics import track_outbound
+
+load_dotenv()
+
+# TMDb API configuration
+TMDB_API_KEY = os.getenv("TMDB_API_KEY")
+TMDB_BASE_URL = os.getenv("TMDB_BASE_URL", "https://api.themoviedb.org/3")
+
+# HTTP client settings
+TMDB_TIMEOUT = float(os.getenv("TMDB_TIMEOUT", "10"))
+TMDB_CONNECT_TIMEOUT = float(os.getenv("TMDB_CONNECT_TIMEOUT", "5"))
+TMDB_MAX_CONNECTIONS = int(os.getenv("TMDB_MAX_CONNECTIONS", "100"))
+TMDB_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("TMDB_MAX_KEEPALIVE_CONNECTIONS", "20"))
+TMDB_KEEPALIVE_EXPIRY = float(os.getenv("TMDB_KEEPALIVE_EXPIRY", "30"))
+
+# Outbound rate limit (TMDb allows roughly 50 requests/second per IP)
+TMDB_RATE_LIMIT = float(os.getenv("TMDB_RATE_LIMIT", "40"))
+TMDB_RATE_BURST = int(os.getenv("TMDB_RATE_BURST", "40"))
+
+# Shared client, created on app startup and closed on shutdown
+_client: Optional[httpx.AsyncClient] = None
+
+# Upstream fetches in flight by request, and how many calls joined one
+_in_flight: Dict[Tuple, asyncio.Task] = {}
+coalesced_requests = 0
+
+
+class TokenBucket:
+    """Async token-bucket rate limiter
+
+    Allows bursts of up to `capacity` requests and refills at `rate` tokens
+    per second. Callers wait only as long as needed for the next token.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+rate_limiter = TokenBucket(TMDB_RATE_LIMIT, TMDB_RATE_BURST)
+
+# Numeric path segments (movie IDs) are collapsed in metric labels
+NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def _create_client() -> httpx.AsyncClient:
+    """Create a pooled keep-alive client for TMDb"""
+    return httpx.AsyncClient(
+        base_url=TMDB_BASE_URL,
+        timeout=httpx.Timeout(TMDB_TIMEOUT, connect=TMDB_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=TMDB_MAX_CONNECTIONS,
+            max_keepalive_connections=TMDB_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=TMDB_KEEPALIVE_EXPIRY
+        )
+    )
+
+
+async def start_client():
+    """Open the shared TMDb client"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+
+
+async def close_client():
+    """Close the shared TMDb client and release pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Get the shared TMDb client, creating it lazily outside the app lifespan"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+    return _client
+
+
+async def _fetch(path: str, query: Dict[str, Any]) -> bytes:
+    """Rate-limited GET returning the raw response body"""
+    await rate_limiter.acquire()
+    with track_outbound("tmdb", NUMERIC_SEGMENT.sub("/{id}", path)):
+        response = await get_client().get(path, params=query)
+        response.raise_for_status()
+    return response.content
+
+
+def _request_key(path: str, query: Dict[str, Any]) -> Tuple:
+    return path, tuple(sorted((name, str(value)) for name, value in query.items()))
+
+
+def _forget(key: Tuple, task: asyncio.Task):
+    """Drop a finished fetch; retrieve its error in case every waiter went away"""
+    if _in_flight.get(key) is task:
+        del _in_flight[key]
+    if not task.cancelled():
+        task.exception()
+
+
+async def tmdb_get(path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """GET a TMDb endpoint and return the decoded JSON body
+
+    Concurrent calls for the same path and params share a single upstream
+    request (single flight). Every caller gets its own decoded copy, so
+    results can be modified freely.
+
+    Raises httpx.HTTPError on network failures and non-2xx responses.
+    """
+    global coalesced_requests
+    query = {"api_key": TMDB_API_KEY}
+    if params:
+        query.update(params)
+
+    key = _request_key(path, query)
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch(path, query))
+        _in_flight[key] = task
+        task.add_done_callback(functools.partial(_forget, key))
+    else:
+        coalesced_requests += 1
+
+    # Shielded so a cancelled caller doesn't cancel the fetch for the others
+    content = await asyncio.shield(task)
+    return json.loads(content)
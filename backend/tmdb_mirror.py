@@ -0,0 +1,220 @@
+"""Offline TMDb mirror: a local copy of the catalogue in Postgres
+
+Import a TMDb-format dump, one movie details object per line (optionally
+gzipped), then set TMDB_MIRROR_MODE=true to serve popular, search and
+details reads from the mirror instead of the TMDb API:
+
+    python tmdb_mirror.py movies.jsonl.gz
+    python tmdb_mirror.py movies.jsonl --chunk-size 5000 --replace
+
+Records need at least an `id` and a title; missing list-view fields get
+TMDb's defaults. Importing the same movie again replaces it.
+"""
+import argparse
+import gzip
+import json
+import math
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from cache import TTLCache
+from database import AsyncSessionLocal, create_tables, engine
+from models.mirror_movie import MirrorMovie
+from title_index import normalize_title
+
+# Serve catalogue reads from the local mirror instead of the TMDb API
+TMDB_MIRROR_MODE = os.getenv("TMDB_MIRROR_MODE", "false").lower() in ("1", "true", "yes")
+
+TMDB_MIRROR_IMPORT_CHUNK = int(os.getenv("TMDB_MIRROR_IMPORT_CHUNK", "2000"))
+
+# TMDb list pages: 20 results, and no more than 500 pages
+PAGE_SIZE = 20
+MAX_PAGES = 500
+
+# Fields of a movie in TMDb list results (search, popular), with their defaults
+SUMMARY_DEFAULTS = {
+    "adult": False,
+    "backdrop_path": None,
+    "genre_ids": [],
+    "id": None,
+    "original_language": "",
+    "original_title": "",
+    "overview": "",
+    "popularity": 0.0,
+    "poster_path": None,
+    "release_date": "",
+    "title": "",
+    "video": False,
+    "vote_average": 0.0,
+    "vote_count": 0,
+}
+
+# Number of listable movies, counted at most once per TTL
+count_cache = TTLCache(max_entries=1, default_ttl=float(os.getenv("TMDB_MIRROR_COUNT_TTL", "300")))
+
+
+def movie_row(movie: Dict[str, Any]) -> Optional[dict]:
+    """Mirror row for a dump record, or None if it lacks an ID or title"""
+    title = movie.get("title") or movie.get("original_title")
+    if not isinstance(movie.get("id"), int) or not title:
+        return None
+
+    details = {**movie, "title": title, "original_title": movie.get("original_title") or title}
+    details.setdefault("genres", [])
+    summary = {field: details.get(field, default) for field, default in SUMMARY_DEFAULTS.items()}
+    if "genre_ids" not in details:
+        summary["genre_ids"] = [genre["id"] for genre in details["genres"] if "id" in genre]
+
+    return {
+        "movie_id": details["id"],
+        "title": title,
+        "normalized_title": normalize_title(title) or title.strip(),
+        "search_text": f"{normalize_title(title)} {normalize_title(details['original_title'])}",
+        "popularity": float(summary["popularity"] or 0.0),
+        "adult": bool(summary["adult"]),
+        "summary": summary,
+        "details": details,
+    }
+
+
+def read_dump(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the JSON objects of a (possibly gzipped) JSON lines file"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as dump:
+        for line in dump:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def build_upsert():
+    stmt = pg_insert(MirrorMovie)
+    return stmt.on_conflict_do_update(
+        index_elements=[MirrorMovie.movie_id],
+        set_={
+            **{column: stmt.excluded[column] for column in ("title", "normalized_title", "search_text", "popularity", "adult", "summary", "details")},
+            "imported_at": func.now()
+        }
+    )
+
+
+upsert = build_upsert()
+
+
+def import_dump(path: str, chunk_size: int = TMDB_MIRROR_IMPORT_CHUNK, replace: bool = False) -> int:
+    """Load a dump into the mirror, printing progress per chunk
+
+    With `replace`, movies missing from the dump are removed in the same
+    transaction as the import. Returns the number of movies imported.
+    """
+    create_tables()
+    imported = skipped = 0
+    start = time.perf_counter()
+
+    with engine.begin() as connection:
+        if replace:
+            connection.execute(delete(MirrorMovie))
+
+        chunk: List[dict] = []
+        for movie in read_dump(path):
+            row = movie_row(movie)
+            if row is None:
+                skipped += 1
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                connection.execute(upsert, chunk)
+                imported += len(chunk)
+                chunk = []
+                print(f"{imported} movies imported ({imported / (time.perf_counter() - start):.0f}/s)")
+        if chunk:
+            connection.execute(upsert, chunk)
+            imported += len(chunk)
+
+    if skipped:
+        print(f"Skipped {skipped} records without an id or title")
+    return imported
+
+
+def list_page(page: int, results: List[dict], total: int) -> Dict[str, Any]:
+    """TMDb-shaped page of list results"""
+    return {
+        "page": page,
+        "results": results,
+        "total_pages": min(MAX_PAGES, math.ceil(total / PAGE_SIZE)),
+        "total_results": total,
+    }
+
+
+async def popular_movies(page: int = 1) -> Dict[str, Any]:
+    """A page of non-adult movies by popularity, like TMDb /movie/popular"""
+    page = max(page, 1)
+    async with AsyncSessionLocal() as db:
+        total = count_cache.get("listable")
+        if total is None:
+            total = (await db.execute(select(func.count()).where(MirrorMovie.adult.is_(False)))).scalar_one()
+            count_cache.set("listable", total)
+        result = await db.execute(
+            select(MirrorMovie.summary)
+            .where(MirrorMovie.adult.is_(False))
+            .order_by(MirrorMovie.popularity.desc(), MirrorMovie.movie_id)
+            .offset((page - 1) * PAGE_SIZE)
+            .limit(PAGE_SIZE)
+        )
+        return list_page(page, list(result.scalars().all()), total)
+
+
+async def search_movies(query: str, page: int = 1) -> Dict[str, Any]:
+    """Title search, like TMDb /search/movie
+
+    Every word of the query must prefix a word of the title or original
+    title, ignoring case, accents and punctuation. Exact title matches come
+    first, then the most popular.
+    """
+    page = max(page, 1)
+    words = normalize_title(query).split()
+    if not words:
+        return list_page(page, [], 0)
+
+    # Each word is quoted so the text search parser splits it the same way
+    # it split the stored titles
+    matches = and_(
+        MirrorMovie.search_vector.op("@@")(
+            func.to_tsquery("simple", " & ".join(f"'{word}':*" for word in words))
+        ),
+        MirrorMovie.adult.is_(False)
+    )
+    async with AsyncSessionLocal() as db:
+        total = (await db.execute(select(func.count()).where(matches))).scalar_one()
+        result = await db.execute(
+            select(MirrorMovie.summary)
+            .where(matches)
+            .order_by(
+                (MirrorMovie.normalized_title == " ".join(words)).desc(),
+                MirrorMovie.popularity.desc(),
+                MirrorMovie.movie_id
+            )
+            .offset((page - 1) * PAGE_SIZE)
+            .limit(PAGE_SIZE)
+        )
+        return list_page(page, list(result.scalars().all()), total)
+
+
+async def movie_details(movie_id: int) -> Optional[Dict[str, Any]]:
+    """Stored TMDb details object for a movie, or None if it isn't mirrored"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(MirrorMovie.details).where(MirrorMovie.movie_id == movie_id))
+        return result.scalar_one_or_none()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a TMDb JSON lines dump into the local mirror")
+    parser.add_argument("dump", help="JSON lines file with one TMDb movie details object per line (.gz allowed)")
+    parser.add_argument("--chunk-size", type=int, default=TMDB_MIRROR_IMPORT_CHUNK, help="Movies written per statement")
+    parser.add_argument("--replace", action="store_true", help="Remove mirrored movies that are not in the dump")
+    args = parser.parse_args()
+
+    imported = import_dump(args.dump, args.chunk_size, args.replace)
+    print(f"Imported {imported} movies into the TMDb mirror")
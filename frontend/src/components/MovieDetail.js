@@ -12,6 +12,8 @@ const MovieDetail = () => {
   const [stats, setStats] = useState({ average_rating: 0, total_reviews: 0 });
   const [loading, setLoading] = useState(true);
   const [reviewsLoading, setReviewsLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMoreReviews, setLoadingMoreReviews] = useState(false);
   const [error, setError] = useState(null);
 
   // Review form state
@@ -35,6 +37,7 @@ const MovieDetail = () => {
 
         setMovie(movieResponse.data);
         setReviews(reviewsResponse.data);
+        setNextCursor(reviewsResponse.headers['x-next-cursor'] || null);
         setStats(statsResponse.data);
       } catch (error) {
         console.error('Failed to fetch movie data:', error);
@@ -50,6 +53,19 @@ const MovieDetail = () => {
     }
   }, [id]);
 
+  const loadMoreReviews = async () => {
+    try {
+      setLoadingMoreReviews(true);
+      const response = await reviewsApi.getByMovieId(id, nextCursor);
+      setReviews(prev => [...prev, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Failed to load more reviews:', error);
+    } finally {
+      setLoadingMoreReviews(false);
+    }
+  };
+
   const handleSubmitReview = async (e) => {
     e.preventDefault();
     if (!reviewData.content.trim()) return;
@@ -304,6 +320,17 @@ const MovieDetail = () => {
                   <p className="text-gray-300 leading-relaxed">{review.content}</p>
                 </div>
               ))}
+              {nextCursor && (
+                <div className="text-center">
+                  <button
+                    onClick={loadMoreReviews}
+                    disabled={loadingMoreReviews}
+                    className="text-purple-300 hover:text-purple-200 disabled:text-gray-500 transition-colors"
+                  >
+                    {loadingMoreReviews ? 'Loading...' : 'Load more reviews'}
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </div>
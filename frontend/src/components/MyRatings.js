@@ -22,21 +22,18 @@ const MyRatings = () => {
     const fetchUserReviews = async () => {
       try {
         setLoading(true);
-        const response = await reviewsApi.getByUserId(userId);
+        const response = await reviewsApi.getAllByUserId(userId);
         const userReviews = response.data;
         setReviews(userReviews);
 
-        // Fetch movie details for each review
+        // Fetch movie details for all reviewed movies in batches
         const movieIds = [...new Set(userReviews.map(review => review.movie_id))];
-        const moviePromises = movieIds.map(id => moviesApi.getById(id));
         
         try {
-          const movieResponses = await Promise.all(moviePromises);
-          const movieMap = {};
-          movieResponses.forEach(response => {
-            movieMap[response.data.id] = response.data;
-          });
-          setMoviesData(movieMap);
+          if (movieIds.length > 0) {
+            const movieResponse = await moviesApi.getBatch(movieIds);
+            setMoviesData(movieResponse.data.movies);
+          }
         } catch (movieError) {
           console.error('Failed to fetch some movie details:', movieError);
         }
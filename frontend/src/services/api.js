@@ -7,25 +7,62 @@ const api = axios.create({
   timeout: 10000,
 });
 
+// Matches the backend's default MOVIES_BATCH_MAX_IDS
+const MOVIES_BATCH_MAX_IDS = 500;
+
 // Movies API
 export const moviesApi = {
   getPopular: (page = 1) => api.get(`/movies/popular?page=${page}`),
   search: (query, page = 1) => api.get(`/movies/search?q=${encodeURIComponent(query)}&page=${page}`),
   getById: (id) => api.get(`/movies/${id}`),
+  // The backend accepts at most MOVIES_BATCH_MAX_IDS ids per request, so large lists are split and merged
+  getBatch: async (ids) => {
+    const chunks = [];
+    for (let i = 0; i < ids.length; i += MOVIES_BATCH_MAX_IDS) {
+      chunks.push(ids.slice(i, i + MOVIES_BATCH_MAX_IDS));
+    }
+    const responses = await Promise.all(chunks.map(chunk => api.get(`/movies/batch?ids=${chunk.join(',')}`)));
+    return {
+      data: {
+        movies: Object.assign({}, ...responses.map(response => response.data.movies)),
+        not_found: responses.flatMap(response => response.data.not_found),
+        failed: responses.flatMap(response => response.data.failed || []),
+      },
+    };
+  },
 };
 
 // Reviews API
 export const reviewsApi = {
   create: (reviewData) => api.post('/reviews/', reviewData),
-  getByMovieId: (movieId) => api.get(`/reviews/${movieId}`),
-  getByUserId: (userId) => api.get(`/reviews/user/${userId}`),
+  getByMovieId: (movieId, cursor = null) => api.get(`/reviews/${movieId}`, { params: { cursor } }),
+  getByUserId: (userId, cursor = null, limit = 100) => api.get(`/reviews/user/${userId}`, { params: { cursor, limit } }),
+  // Follows X-Next-Cursor until every page of the user's reviews is loaded
+  getAllByUserId: async (userId) => {
+    const reviews = [];
+    let cursor = null;
+    do {
+      const response = await reviewsApi.getByUserId(userId, cursor);
+      reviews.push(...response.data);
+      cursor = response.headers['x-next-cursor'] || null;
+    } while (cursor);
+    return { data: reviews };
+  },
   getMovieStats: (movieId) => api.get(`/reviews/stats/${movieId}`),
+  getMovieStatsBatch: (movieIds) => api.post('/reviews/stats/batch', { movie_ids: movieIds }),
   getRecommendations: (userId) => api.get(`/reviews/recommendations/${userId}`),
 };
 
 // Sentiment API
 export const sentimentApi = {
   analyze: (text) => api.post('/sentiment/analyze', { text }),
+  analyzeBatch: (texts) => api.post('/sentiment/analyze/batch', { texts }),
+};
+
+// Analytics API
+export const analyticsApi = {
+  getOverview: () => api.get('/analytics/overview'),
+  getMovies: (ids) => api.get('/analytics/movies', { params: ids ? { ids: ids.join(',') } : {} }),
 };
 
 // Authentication API